@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+    )
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    )
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Returns the User row for `user_id`, cached for JWT_USER_CACHE_TTL seconds, and applies the same checks as
+# JWTAuthentication: missing and inactive users are rejected.
+def get_cached_user(user_id):
+    key = f'auth:user:{user_id}'
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        cache.set(key, user, getattr(settings, 'JWT_USER_CACHE_TTL', 60))
+
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    return user
+
+
+# Drops the cached row, connected to User saves and deletes so a deactivated or deleted user is rejected right away.
+# It runs once more after the transaction commits, so a concurrent request can't cache the pre-commit row.
+def forget_cached_user(user_id):
+    key = f'auth:user:{user_id}'
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+# Returns a model instance for request.user, whichever authentication mode produced it.
+def get_user_instance(user):
+    if isinstance(user, User):
+        return user
+    return user.db_user
+
+
+class CachedTokenUser(TokenUser):
+    # the User row, for the few places that really need it (e.g. to be saved as a foreign key)
+    @cached_property
+    def db_user(self):
+        return get_cached_user(self.id)
+
+
+# JWTAuthentication with an optional stateless mode. When JWT_STATELESS_AUTH is on, request.user is built from the
+# token claims (user_id, username, is_staff) with no database query. Tokens stay valid until they expire even if
+# the user is deactivated or deleted in the meantime; only code that calls get_user_instance() notices.
+class ConfigurableJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if getattr(settings, 'JWT_STATELESS_AUTH', False):
+            return JWTStatelessUserAuthentication.get_user(self, validated_token)
+        return super().get_user(validated_token)
+
+    # authenticate() for async views: decoding the token needs no I/O and the User row is read with the async ORM,
+    # so no thread is held while waiting for the database
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if getattr(settings, 'JWT_STATELESS_AUTH', False):
+            return JWTStatelessUserAuthentication.get_user(self, validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from . import hashing
+
+
+# Django's PBKDF2-SHA256 hasher (same algorithm name, so existing hashes verify either way) with the iteration
+# count of PASSWORD_PBKDF2_ITERATIONS, Django's default when unset, computed in the auth.hashing pool. Hashes made
+# with another count are upgraded on the next successful login.
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or hashers.PBKDF2PasswordHasher.iterations
+
+    def encode(self, password, salt, iterations=None):
+        return hashing.run(super().encode, password, salt, iterations)
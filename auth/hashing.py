@@ -0,0 +1,67 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+
+
+# Password hashes are computed by a pool of PASSWORD_HASHING_WORKERS threads (hashlib releases the GIL while it
+# hashes), so a burst of logins and registrations keeps at most that many cores busy and the others free for the
+# rest of the API. Callers wait for a worker, except inside reject_when_busy(), where a hash finding
+# PASSWORD_HASHING_BACKLOG others already waiting raises PoolBusy instead of queueing. With 0 workers hashes run
+# on the calling thread.
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+_reject_when_busy = contextvars.ContextVar('reject_when_busy', default=False)
+
+
+class PoolBusy(Exception):
+    pass
+
+
+def _default_workers():
+    return max((os.cpu_count() or 1) // 2, 1)
+
+
+def _get_pool():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None)
+                workers = _default_workers() if workers is None else workers
+                backlog = getattr(settings, 'PASSWORD_HASHING_BACKLOG', 64)
+                if workers:
+                    _slots = threading.BoundedSemaphore(workers + backlog)
+                    _executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hashing')
+                else:
+                    _executor = False
+    return _executor, _slots
+
+
+# Hashes run in this block raise PoolBusy rather than wait when the backlog is full, for the API views that can
+# answer with a 429; the admin and management commands keep waiting.
+@contextmanager
+def reject_when_busy():
+    token = _reject_when_busy.set(True)
+    try:
+        yield
+    finally:
+        _reject_when_busy.reset(token)
+
+
+# Runs `function(*args)` in the hashing pool and waits for its result.
+def run(function, *args):
+    executor, slots = _get_pool()
+    if not executor:
+        return function(*args)
+
+    if not slots.acquire(blocking=not _reject_when_busy.get()):
+        raise PoolBusy('Too many password hashes in progress.')
+    try:
+        return executor.submit(function, *args).result()
+    finally:
+        slots.release()
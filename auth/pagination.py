@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+# keyset pagination on the primary key, no COUNT query and the same cost for every page
+class UserCursorPagination(CursorPagination):
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -4,15 +4,33 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-from events.models import Event
 
+# ids of the user's first events in start_date order, the full list is paged by /events/?created_by=<id>
+CREATED_EVENTS_LIMIT = 20
 
+
+# Read-only. UserView prefetches `created_events_slice` and annotates `created_event_count` for a whole page at
+# once; a plain User instance falls back to two queries of its own.
 class UserSerializer(serializers.ModelSerializer):
-    created_events = serializers.PrimaryKeyRelatedField(many=True, queryset=Event.objects.all())
+    created_events = serializers.SerializerMethodField()
+    created_event_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'created_events']
+        fields = ['id', 'username', 'email', 'created_events', 'created_event_count']
+        read_only_fields = fields
+
+    def get_created_events(self, user):
+        events = getattr(user, 'created_events_slice', None)
+        if events is None:
+            events = user.created_events.order_by('start_date', 'id')[:CREATED_EVENTS_LIMIT]
+        return [event.pk for event in events]
+
+    def get_created_event_count(self, user):
+        count = getattr(user, 'created_event_count', None)
+        if count is None:
+            count = user.created_events.count()
+        return count
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -23,6 +41,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
         # Add custom claims
         token['username'] = user.username
+        token['is_staff'] = user.is_staff
         return token
 
 
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import (
+    TestCase,
+    override_settings,
+    )
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from auth.authentication import CachedTokenUser
+from auth.serializers import MyTokenObtainPairSerializer
+from events.cache import get_cache
+from events.models import Event
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class StatelessJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword', is_staff=True)
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.event_data = {
+            'name': 'New Event',
+            'start_date': (timezone.now() + timedelta(days=2)).isoformat(),
+            'end_date': (timezone.now() + timedelta(days=3)).isoformat(),
+            'capacity': 50
+            }
+
+    def test_read_endpoint_runs_no_auth_query(self):
+        # ETag aggregate and the page query, no User lookup
+        with self.assertNumQueries(2):
+            response = self.client.get('/events/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.wsgi_request.user, CachedTokenUser)
+
+    def test_user_built_from_claims(self):
+        response = self.client.get('/events/')
+        user = response.wsgi_request.user
+
+        self.assertEqual(user.id, self.user.id)
+        self.assertEqual(user.username, 'testuser')
+        self.assertTrue(user.is_staff)
+
+    def test_create_uses_cached_user_row(self):
+        response = self.client.post('/events/', self.event_data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_by'], 'testuser')
+
+        # the row is reused for JWT_USER_CACHE_TTL seconds
+        with self.assertNumQueries(0):
+            response.wsgi_request.user.db_user
+        self.assertEqual(Event.objects.get().created_by, self.user)
+
+    def test_register_needs_no_user_row(self):
+        event = Event.objects.create(name='Test Event', start_date=timezone.now() + timedelta(days=1),
+                                     end_date=timezone.now() + timedelta(days=2), capacity=10, created_by=self.user)
+
+        response = self.client.post(f'/events/{event.pk}/register/')
+
+        self.assertEqual(response.data['message'], f'Registered user: {self.user.id} for event: {event.pk}')
+        self.assertIn(self.user, event.attendees.all())
+
+    def test_revocation_semantics(self):
+        self.client.post('/events/', self.event_data)
+        self.user.is_active = False
+        self.user.save()
+
+        # stateless reads keep working until the access token expires
+        self.assertEqual(self.client.get('/events/').status_code, 200)
+
+        # saving the user drops the cached row, so endpoints that need it reject the user right away
+        response = self.client.post('/events/', self.event_data)
+        self.assertEqual(response.status_code, 401)
+
+        with override_settings(JWT_STATELESS_AUTH=False):
+            self.assertEqual(self.client.get('/events/').status_code, 401)
+
+    def test_deleted_user(self):
+        other = User.objects.create_user(username='other', password='testpassword')
+        token = MyTokenObtainPairSerializer.get_token(other).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        other.delete()
+
+        self.assertEqual(client.get('/events/').status_code, 200)
+        self.assertEqual(client.post('/events/', self.event_data).status_code, 401)
+
+    def test_deleting_a_user_drops_the_cached_row(self):
+        self.assertEqual(self.client.post('/events/', self.event_data).status_code, 201)
+        Event.objects.all().delete()
+        self.user.delete()
+
+        self.assertEqual(self.client.post('/events/', self.event_data).status_code, 401)
+
+
+class DefaultJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_loads_user_row(self):
+        # User lookup, ETag aggregate and the page query
+        with self.assertNumQueries(3):
+            response = self.client.get('/events/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.wsgi_request.user, User)
@@ -0,0 +1,142 @@
+import threading
+from unittest import (
+    mock,
+    skipUnless,
+    )
+from django.conf import settings
+from django.contrib.auth import hashers as django_hashers
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    make_password,
+    )
+from django.contrib.auth.models import User
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+    )
+from rest_framework.test import APIClient
+
+from auth import hashing
+
+
+# a fresh pool for every test, built from the test's settings
+@mock.patch.object(hashing, '_executor', None)
+@mock.patch.object(hashing, '_slots', None)
+class HashingPoolTestCase(SimpleTestCase):
+    @override_settings(PASSWORD_HASHING_WORKERS=2)
+    def test_runs_in_the_pool(self):
+        name = hashing.run(lambda: threading.current_thread().name)
+
+        self.assertTrue(name.startswith('password-hashing'))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_runs_inline_without_workers(self):
+        self.assertEqual(hashing.run(threading.current_thread), threading.current_thread())
+
+    # runs `check` while the only worker is busy and no backlog is allowed
+    def _with_busy_pool(self, check):
+        started = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            started.set()
+            release.wait(5)
+
+        holder = threading.Thread(target=hashing.run, args=(hold,))
+        holder.start()
+        try:
+            started.wait(5)
+            return check(release)
+        finally:
+            release.set()
+            holder.join()
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_BACKLOG=0)
+    def test_rejects_past_the_backlog_when_asked_to(self):
+        def check(release):
+            with hashing.reject_when_busy(), self.assertRaises(hashing.PoolBusy):
+                hashing.run(lambda: None)
+
+        self._with_busy_pool(check)
+        self.assertIsNone(hashing.run(lambda: None))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_BACKLOG=0)
+    def test_waits_past_the_backlog_otherwise(self):
+        def check(release):
+            threading.Timer(0.05, release.set).start()
+            return hashing.run(lambda: 'hashed')
+
+        self.assertEqual(self._with_busy_pool(check), 'hashed')
+
+
+@mock.patch.object(hashing, '_executor', None)
+@mock.patch.object(hashing, '_slots', None)
+@override_settings(PASSWORD_HASHERS=['auth.hashers.PBKDF2PasswordHasher'], PASSWORD_PBKDF2_ITERATIONS=1000,
+                   PASSWORD_HASHING_WORKERS=1)
+class PBKDF2PasswordHasherTestCase(SimpleTestCase):
+    def test_iterations_come_from_the_settings(self):
+        encoded = make_password('secret')
+
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(check_password('secret', encoded))
+        self.assertFalse(check_password('other', encoded))
+
+    def test_verifies_and_upgrades_django_hashes(self):
+        encoded = django_hashers.PBKDF2PasswordHasher().encode('secret', 'salt', iterations=2000)
+        setter = mock.Mock()
+
+        self.assertTrue(check_password('secret', encoded, setter))
+        setter.assert_called_once_with('secret')
+
+    def test_hashes_in_the_pool(self):
+        threads = []
+        real_pbkdf2 = django_hashers.pbkdf2
+
+        def pbkdf2(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return real_pbkdf2(*args, **kwargs)
+
+        with mock.patch('django.contrib.auth.hashers.pbkdf2', pbkdf2):
+            make_password('secret')
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('password-hashing'))
+
+
+@skipUnless(settings.PASSWORD_HASHER_PROFILE == 'fast', 'PASSWORD_HASHER_PROFILE overridden')
+class TestHasherTestCase(SimpleTestCase):
+    def test_suite_uses_the_fast_hasher(self):
+        self.assertEqual(get_hasher().algorithm, 'md5')
+
+
+@override_settings(PASSWORD_HASHERS=['auth.hashers.PBKDF2PasswordHasher'], PASSWORD_PBKDF2_ITERATIONS=1000)
+class HashingPoolViewTestCase(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='testuser', password='testpassword')
+        self.client = APIClient()
+
+    def test_busy_pool_answers_429(self):
+        with mock.patch.object(hashing, 'run', side_effect=hashing.PoolBusy):
+            login = self.client.post('/auth/login/', {'username': 'testuser', 'password': 'testpassword'})
+            register = self.client.post('/auth/register/', {
+                'username': 'newuser', 'email': 'new@example.com', 'password': 'fjJfgljh576^%&^',
+                'password2': 'fjJfgljh576^%&^', 'first_name': 'John', 'last_name': 'Doe'})
+
+        for response in (login, register):
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '1')
+
+    def test_rejection_is_limited_to_the_views(self):
+        seen = []
+
+        def run(function, *args):
+            seen.append(hashing._reject_when_busy.get())
+            return function(*args)
+
+        with mock.patch.object(hashing, 'run', side_effect=run):
+            self.client.post('/auth/login/', {'username': 'testuser', 'password': 'testpassword'})
+            User.objects.get().check_password('testpassword')
+
+        self.assertEqual(seen, [True, False])
@@ -30,12 +30,19 @@ class UserSerializerTestCase(TestCase):
     def test_serializer_contains_expected_fields(self):
         data = self.serializer.data
 
-        self.assertEqual(set(data.keys()), {'id', 'username', 'email', 'created_events'})
+        self.assertEqual(set(data.keys()), {'id', 'username', 'email', 'created_events', 'created_event_count'})
 
     def test_created_events_field_contains_expected_data(self):
         data = self.serializer.data
 
         self.assertEqual(data['created_events'], [self.event1.id, self.event2.id])
+        self.assertEqual(data['created_event_count'], 2)
+
+    def test_serializer_is_read_only(self):
+        serializer = UserSerializer(instance=self.user, data={'created_events': []}, partial=True)
+
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data, {})
 
 
 class RegisterSerializerTestCase(TestCase):
@@ -1,8 +1,14 @@
+from datetime import timedelta
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIRequestFactory
 
+from auth.serializers import CREATED_EVENTS_LIMIT
 from auth.views import MyObtainTokenPairView, RegisterView, UserView
+from events.models import Event
 
 
 factory = APIRequestFactory()
@@ -71,8 +77,8 @@ class UserViewTestCase(TestCase):
         response = view(request)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['username'], 'testuser')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['username'], 'testuser')
 
     def test_retrieve_user(self):
         request = factory.get(f'{self.url}{self.user.id}/')
@@ -81,3 +87,47 @@ class UserViewTestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['username'], 'testuser')
+
+
+class UserViewQueryCountTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpassword')
+        start = timezone.now() + timedelta(days=1)
+        self.events = Event.objects.bulk_create(
+            Event(name=f'Event {i}', start_date=start + timedelta(hours=i), end_date=start + timedelta(days=1),
+                  capacity=10, created_by=self.creator) for i in range(CREATED_EVENTS_LIMIT + 5))
+
+    def _list(self, **params):
+        response = UserView.as_view({'get': 'list'})(factory.get('/users/', params))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_created_events_are_bounded_and_counted(self):
+        response = self._list()
+
+        user = response.data['results'][0]
+        self.assertEqual(user['created_events'], [event.pk for event in self.events[:CREATED_EVENTS_LIMIT]])
+        self.assertEqual(user['created_event_count'], len(self.events))
+
+    def test_query_count_is_constant_per_page(self):
+        with self.assertNumQueries(2):
+            self._list()
+
+        for i in range(30):
+            User.objects.create(username=f'user{i}')
+        with self.assertNumQueries(2):
+            response = self._list(page_size=20)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][1]['created_event_count'], 0)
+
+    def test_retrieve_query_count(self):
+        with self.assertNumQueries(2):
+            response = UserView.as_view({'get': 'retrieve'})(factory.get('/users/'), pk=self.creator.pk)
+
+        self.assertEqual(response.data['created_event_count'], len(self.events))
+
+    def test_pages_do_not_load_passwords(self):
+        with CaptureQueriesContext(connection) as context:
+            self._list()
+
+        self.assertNotIn('password', context.captured_queries[0]['sql'])
@@ -1,27 +1,63 @@
 from django.contrib.auth.models import User
+from django.db.models import (
+    Count,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    )
+from django.db.models.functions import Coalesce
 from rest_framework import generics
+from rest_framework.exceptions import Throttled
 from rest_framework.permissions import AllowAny
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from events.models import Event
+from . import hashing
+from .pagination import UserCursorPagination
 from .serializers import (
+    CREATED_EVENTS_LIMIT,
     MyTokenObtainPairSerializer,
     RegisterSerializer,
     UserSerializer,
     )
 
 
-class MyObtainTokenPairView(TokenObtainPairView):
+# Password hashing in these views gives up when the hashing pool's backlog is full and the client gets a 429.
+class HashingPoolMixin:
+    def dispatch(self, request, *args, **kwargs):
+        with hashing.reject_when_busy():
+            return super().dispatch(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, hashing.PoolBusy):
+            exc = Throttled(wait=1, detail='Too many logins in progress, retry shortly.')
+        return super().handle_exception(exc)
+
+
+class MyObtainTokenPairView(HashingPoolMixin, TokenObtainPairView):
     permission_classes = (AllowAny,)
     serializer_class = MyTokenObtainPairSerializer
 
 
-class RegisterView(generics.CreateAPIView):
+class RegisterView(HashingPoolMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = RegisterSerializer
 
 
+# Users paged by id. A page costs two queries whatever its size: the users with their event count (a subquery on
+# event_creator_start_idx) and one prefetch of the first CREATED_EVENTS_LIMIT event ids of every user on it.
 class UserView(ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = UserCursorPagination
+
+    def get_queryset(self):
+        counts = Event.objects.filter(created_by=OuterRef('pk')).values('created_by').annotate(
+            total=Count('pk')).values('total')
+        events = Event.objects.only('id', 'created_by_id').order_by('start_date', 'id')[:CREATED_EVENTS_LIMIT]
+
+        return super().get_queryset().only('id', 'username', 'email').annotate(
+            created_event_count=Coalesce(Subquery(counts), 0),
+            ).prefetch_related(Prefetch('created_events', queryset=events, to_attr='created_events_slice'))
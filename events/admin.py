@@ -1,13 +1,112 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
 
+from . import registration
 from .models import Event
 
 
+# Admin paginator that skips the COUNT(*) of an unfiltered changelist on large PostgreSQL tables, where it reads
+# the whole table, and uses the planner's row estimate instead. Filtered lists, small tables and other databases
+# are counted exactly.
+class EstimatedCountPaginator(Paginator):
+    # below this a count is cheap and the estimate too rough to show
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _estimate(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.where:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 (or 0) until the table is first analyzed
+        return int(row[0]) if row and row[0] > 0 else None
+
+
+# Shows one page of an event's attendance rows, `?attendees_page=` picks it. The number of pages comes from the
+# denormalised attendee_count, so paging costs no COUNT query.
+class AttendancePageFormSet(BaseInlineFormSet):
+    page_param = 'attendees_page'
+    per_page = 50
+    page_number = 1
+
+    @cached_property
+    def paginator(self):
+        total = self.instance.attendee_count if self.instance.pk else 0
+        return Paginator(range(total), self.per_page)
+
+    @cached_property
+    def page(self):
+        return self.paginator.get_page(self.page_number)
+
+    def page_range(self):
+        return self.paginator.get_elided_page_range(self.page.number)
+
+    def get_queryset(self):
+        if not hasattr(self, '_page_queryset'):
+            offset = (self.page.number - 1) * self.per_page
+            self._page_queryset = super().get_queryset()[offset:offset + self.per_page]
+        return self._page_queryset
+
+
+class AttendanceInline(admin.TabularInline):
+    model = Event.attendees.through
+    formset = AttendancePageFormSet
+    template = 'admin/events/attendance_inline.html'
+    # a select listing every user would be rendered in each row
+    raw_id_fields = ('user',)
+    extra = 1
+    verbose_name = 'attendee'
+    verbose_name_plural = 'attendees'
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get(formset.page_param) or 1
+        return formset
+
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'start_date', 'end_date', 'description',
-                    'capacity', 'get_attendees', 'created_by', 'created', 'updated')
+                    'capacity', 'attendee_count', 'created_by', 'created', 'updated')
+    list_select_related = ('created_by',)
+    # start_date ranges use event_start_date_id_idx, the creator filter lists the creators found through
+    # event_creator_start_idx rather than every user
+    list_filter = (
+        ('start_date', admin.DateFieldListFilter),
+        ('end_date', admin.DateFieldListFilter),
+        ('created_by', admin.RelatedOnlyFieldListFilter),
+        )
+    ordering = ('-start_date', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # attendees are edited page by page in the inline instead of a widget holding all of them
+    exclude = ('attendees',)
+    readonly_fields = ('attendee_count',)
+    raw_id_fields = ('created_by',)
+    inlines = [AttendanceInline]
+
+    # the inline writes the attendance table directly, resync the counter and hand freed seats to the waitlist
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        registration.recount_attendees([form.instance.pk])
+        registration.promote_waitlist(form.instance.pk)
 
 
 admin.site.unregister(Group)
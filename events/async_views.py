@@ -0,0 +1,212 @@
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import (
+    HttpResponse,
+    StreamingHttpResponse,
+    )
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAuthenticated,
+    NotFound,
+    ValidationError,
+    )
+from rest_framework.request import Request
+
+from auth.authentication import ConfigurableJWTAuthentication
+from manager.renderers import FastJSONRenderer
+from . import (
+    notifications,
+    registration,
+    )
+from .models import Event
+from .serializers import (
+    EventValuesSerializer,
+    aattach_attendee_ids,
+    )
+from .views import (
+    EventViewSet,
+    register_message,
+    )
+
+
+# Async versions of the EventViewSet list, retrieve, register and unregister endpoints, served under /async/. They
+# accept the same query parameters and return the same JSON, but wait on the database through the async ORM, so
+# under ASGI a slow query or a slow client does not hold one of the worker's threads. Registration keeps its
+# transactions, which Django only runs synchronously, in a thread of its own. Responses are not cached.
+
+renderer = FastJSONRenderer()
+authentication = ConfigurableJWTAuthentication()
+
+# Server-sent events stream: seconds between keep-alive comments, seconds after which the server ends a stream
+# (EventSource reconnects by itself, after `STREAM_RETRY` ms), which bounds the life of streams whose client has
+# gone away without the server noticing
+STREAM_KEEPALIVE = 15
+STREAM_DURATION = 300
+STREAM_RETRY = 1000
+
+
+def json_response(data, status=200, headers=None):
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type, headers=headers)
+
+
+# the response DRF's exception handler gives for `exc`
+def error_response(exc):
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    headers = None
+    if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+        headers = {'WWW-Authenticate': authentication.authenticate_header(None)}
+    return json_response(data, exc.status_code, headers)
+
+
+# Wraps an async view taking a DRF Request: checks the method, authenticates the JWT (authenticated users only, as
+# in EventViewSet) and turns API exceptions into their usual JSON responses.
+def async_api_view(*methods):
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+
+                result = await authentication.aauthenticate(request)
+                if result is None:
+                    raise NotAuthenticated()
+
+                request = Request(request)
+                request.user, request.auth = result
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(exc)
+
+        # authentication is by header only, as in DRF views
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+# an EventViewSet for `action`, whose query parameter handling (filters, ordering, fields) the async views reuse
+def get_viewset(request, action):
+    return EventViewSet(request=request, action=action, format_kwarg=None, args=(), kwargs={})
+
+
+@async_api_view('GET')
+async def event_list(request):
+    view = get_viewset(request, 'list')
+    fields = view.representation_fields()
+    queryset = view.filter_queryset(Event.objects.all()).values(*EventValuesSerializer.columns(fields))
+
+    paginator = view.paginator
+    rows = await paginator.apaginate_queryset(queryset, request, view=view)
+    if 'attendees' in fields and rows:
+        await aattach_attendee_ids(rows)
+
+    data = EventValuesSerializer(rows, many=True, fields=fields).data
+    return json_response(paginator.get_paginated_response(data).data)
+
+
+@async_api_view('GET')
+async def event_detail(request, pk):
+    view = get_viewset(request, 'retrieve')
+    fields = view.representation_fields()
+    queryset = view.filter_queryset(Event.objects.all()).values(*EventValuesSerializer.columns(fields))
+
+    try:
+        row = await queryset.aget(pk=pk)
+    except Event.DoesNotExist:
+        raise NotFound()
+    if 'attendees' in fields:
+        await aattach_attendee_ids([row])
+
+    return json_response(EventValuesSerializer(row, fields=fields).data)
+
+
+@async_api_view('POST')
+async def event_register(request, pk):
+    if not await Event.objects.filter(pk=pk).aexists():
+        raise NotFound()
+
+    result = await sync_to_async(registration.register_attendee)(pk, request.user.id)
+
+    return json_response({
+        'message': register_message(result, request.user.id, pk),
+        'event_id': pk,
+        'user_id': request.user.id,
+        })
+
+
+@async_api_view('POST')
+async def event_unregister(request, pk):
+    if not await Event.objects.filter(pk=pk).aexists():
+        raise NotFound()
+
+    await sync_to_async(registration.unregister_attendee)(pk, request.user.id)
+
+    return json_response({
+        'message': f'Unregistered user: {request.user.id} for event: {pk}',
+        'event_id': pk,
+        'user_id': request.user.id,
+        })
+
+
+def _parse_list(request, param, parse):
+    values = [value.strip() for value in request.query_params.get(param, '').split(',') if value.strip()]
+    try:
+        return [parse(value) for value in values]
+    except ValueError as error:
+        raise ValidationError({param: [str(error)]})
+
+
+def _parse_type(value):
+    if value not in notifications.TYPES:
+        raise ValueError(f'Unknown type {value!r}, choose from: {", ".join(notifications.TYPES)}.')
+    return value
+
+
+# Server-sent events for event changes, instead of polling the list and detail endpoints. `events` (ids) and
+# `types` (created, updated, deleted, registered, unregistered) narrow the stream, comma separated. Each message
+# is `event: <type>` with `data: {"type": ..., "event_ids": [...], "user_ids": [...]}`; a `reset` message means
+# notifications were dropped because the client fell behind, and what it shows should be refetched. Needs the
+# ASGI application, the stream is bound to the event loop that serves it.
+@async_api_view('GET')
+async def event_stream(request):
+    event_ids = _parse_list(request, 'events', int)
+    types = _parse_list(request, 'types', _parse_type)
+
+    backend = notifications.get_backend()
+    subscription = notifications.Subscription(event_ids, types)
+    backend.subscribe(subscription)
+    return EventStreamResponse(backend, subscription)
+
+
+# the subscription ends with the stream, or when the server closes the response
+class EventStreamResponse(StreamingHttpResponse):
+    def __init__(self, backend, subscription):
+        super().__init__(_stream(backend, subscription), content_type='text/event-stream')
+        self.backend = backend
+        self.subscription = subscription
+        self['Cache-Control'] = 'no-cache'
+        # no proxy buffering, messages must reach the client as they are sent
+        self['X-Accel-Buffering'] = 'no'
+
+    def close(self):
+        self.backend.unsubscribe(self.subscription)
+        super().close()
+
+
+async def _stream(backend, subscription):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_DURATION
+    try:
+        yield f'retry: {STREAM_RETRY}\n\n'
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(subscription.get(), min(STREAM_KEEPALIVE, remaining))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield f'event: {message["type"]}\ndata: {renderer.render(message).decode()}\n\n'
+    finally:
+        backend.unsubscribe(subscription)
@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .conditional import (
+    not_modified_response,
+    set_validators,
+    )
+
+
+# query params whose results depend on who is asking
+USER_DEPENDENT_PARAMS = ('attending',)
+# query params whose results depend on the current time, which no write invalidates
+TIME_DEPENDENT_PARAMS = ('past', 'future')
+
+LIST_VERSION_KEY = 'events:list:version'
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'EVENTS_CACHE_ALIAS', 'events')]
+
+
+def is_enabled():
+    return getattr(settings, 'EVENTS_RESPONSE_CACHE', True)
+
+
+# requests filtered relative to now go uncached, their results change as events start without any write
+def is_cacheable(request):
+    return is_enabled() and not any(param in request.query_params for param in TIME_DEPENDENT_PARAMS)
+
+
+def cache_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.update(hits=0, misses=0)
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+# Versions are seeded from the clock, so a version key evicted by the cache can never come back with a number
+# that still has entries cached under it.
+def _get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def _bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _event_version_key(event_id):
+    return f'events:detail:{event_id}:version'
+
+
+def request_digest(request):
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    user_dependent = any(param in request.query_params for param in USER_DEPENDENT_PARAMS)
+    user = request.user.id if user_dependent else None
+    raw = repr((request.get_host(), user, params))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def list_key(request):
+    return f'events:list:{_get_version(LIST_VERSION_KEY)}:{request_digest(request)}'
+
+
+def detail_key(request, event_id):
+    version = _get_version(_event_version_key(event_id))
+    return f'events:detail:{event_id}:{version}:{request_digest(request)}'
+
+
+# Serves a response from the cache, or builds it with `build()` and caches it when it is a 200. The ETag and
+# Last-Modified computed by `validators()` are cached with the data, so a client polling with If-None-Match gets
+# its 304 straight from the cache without touching the database.
+def cached_response(request, key, build, validators):
+    cacheable = is_cacheable(request)
+    entry = get_cache().get(key) if cacheable else None
+    if entry is not None:
+        etag, last_modified, data = entry
+    else:
+        etag, last_modified = validators()
+
+    response = not_modified_response(request, etag, last_modified)
+    if response is None and entry is not None:
+        response = Response(data)
+        set_validators(response, etag, last_modified)
+    if response is not None:
+        if cacheable:
+            _record('hits' if entry is not None else 'misses')
+            response['X-Cache'] = 'HIT' if entry is not None else 'MISS'
+        return response
+
+    response = build()
+    set_validators(response, etag, last_modified)
+    if cacheable:
+        _record('misses')
+        response['X-Cache'] = 'MISS'
+        if response.status_code == 200:
+            get_cache().set(key, (etag, last_modified, response.data))
+    return response
+
+
+def summary_key(user_id):
+    return f'events:summary:{_get_version(LIST_VERSION_KEY)}:{user_id}'
+
+
+# A user's summary counts, built by `build()` on a miss. They are versioned with the lists, which every event or
+# registration change invalidates.
+def cached_summary(user_id, build):
+    if not is_enabled():
+        return build()
+
+    key = summary_key(user_id)
+    summary = get_cache().get(key)
+    _record('hits' if summary is not None else 'misses')
+    if summary is None:
+        summary = build()
+        get_cache().set(key, summary)
+    return summary
+
+
+def _invalidate(event_ids):
+    _bump_version(LIST_VERSION_KEY)
+    for event_id in event_ids:
+        _bump_version(_event_version_key(event_id))
+
+
+# Drops the cached detail responses of the given events and every cached list. It runs right away and once more
+# after the transaction commits, so a concurrent reader can't cache the pre-commit state under the new version.
+def invalidate_events(event_ids):
+    event_ids = list(event_ids)
+    _invalidate(event_ids)
+    transaction.on_commit(lambda: _invalidate(event_ids))
+
+
+def invalidate_event(event_id):
+    invalidate_events([event_id])
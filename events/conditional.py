@@ -0,0 +1,56 @@
+import hashlib
+from django.db.models import (
+    Count,
+    Max,
+    )
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    http_date,
+    quote_etag,
+    )
+
+
+# ETag and Last-Modified of a list: max(updated) and the row count of the filtered queryset change on every insert,
+# update, delete and attendance change, and are computed by one aggregate query without loading any event.
+def list_validators(request, queryset, variant):
+    aggregate = queryset.aggregate(last_modified=Max('updated'), count=Count('pk'))
+    last_modified = aggregate['last_modified']
+    raw = f'{variant}:{aggregate["count"]}:{last_modified.isoformat() if last_modified else ""}'
+    return _etag(raw), last_modified
+
+
+def detail_validators(request, queryset, pk, variant):
+    try:
+        updated = queryset.filter(pk=pk).order_by().values_list('updated', flat=True).first()
+    except (TypeError, ValueError):
+        updated = None
+    if updated is None:
+        return None, None
+    return _etag(f'{variant}:{pk}:{updated.isoformat()}'), updated
+
+
+def _etag(raw):
+    return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+
+# Returns a 304 response when the request's If-None-Match/If-Modified-Since headers match, None otherwise.
+def not_modified_response(request, etag, last_modified):
+    if etag is None:
+        return None
+
+    response = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    if etag is None:
+        return
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value is not None else None
@@ -0,0 +1,70 @@
+import csv
+import json
+from django.http import StreamingHttpResponse
+
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    }
+
+EVENT_COLUMNS = ['id', 'name', 'description', 'start_date', 'end_date', 'capacity', 'attendee_count',
+                 'created_by', 'created', 'updated']
+EVENT_FIELDS = ['id', 'name', 'description', 'start_date', 'end_date', 'capacity', 'attendee_count',
+                'created_by__username', 'created', 'updated']
+
+ATTENDEE_COLUMNS = ['user_id', 'username']
+ATTENDEE_FIELDS = ['user_id', 'user__username']
+
+
+# An object that implements just the write method of the file-like interface, so csv.writer hands back each
+# formatted line instead of buffering it.
+class Echo:
+    def write(self, value):
+        return value
+
+
+def _format_value(value):
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+    return value
+
+
+# Rows are read with a server-side cursor in CHUNK_SIZE batches and written out one by one, so memory use does not
+# grow with the size of the export.
+def _rows(queryset, fields):
+    for row in queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        yield [_format_value(value) for value in row]
+
+
+def _ndjson(rows, columns):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+
+
+def _csv(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def streaming_export(queryset, fields, columns, output, filename):
+    rows = _rows(queryset, fields)
+    content = _csv(rows, columns) if output == 'csv' else _ndjson(rows, columns)
+
+    response = StreamingHttpResponse(content, content_type=FORMATS[output])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
+
+
+def export_events(queryset, output):
+    return streaming_export(queryset, EVENT_FIELDS, EVENT_COLUMNS, output, 'events')
+
+
+def export_attendees(queryset, output, event_id):
+    return streaming_export(queryset, ATTENDEE_FIELDS, ATTENDEE_COLUMNS, output, f'event-{event_id}-attendees')
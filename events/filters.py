@@ -0,0 +1,177 @@
+from datetime import (
+    datetime,
+    time,
+    timedelta,
+    )
+from django.db.models import (
+    F,
+    Q,
+    )
+from django.utils import timezone
+from django.utils.dateparse import (
+    parse_date,
+    parse_datetime,
+    )
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import (
+    BaseFilterBackend,
+    OrderingFilter,
+    )
+
+from .search import get_search_backend
+
+
+TRUE_VALUES = ('true', '1', 'yes')
+FALSE_VALUES = ('false', '0', 'no')
+
+
+# True/False for the accepted spellings of a boolean query parameter, None for anything else
+def parse_bool(value):
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+class QueryParamFilter:
+    # a single query parameter: parse() turns the raw string into a value, filter() applies it to the queryset
+    def __init__(self, param, lookup=None):
+        self.param = param
+        self.lookup = lookup
+
+    def parse(self, value):
+        return value
+
+    def filter(self, queryset, value, request):
+        return queryset.filter(**{self.lookup: value})
+
+    def apply(self, queryset, request):
+        raw = request.query_params.get(self.param)
+        if raw in (None, ''):
+            return queryset
+
+        try:
+            value = self.parse(raw)
+            if value is not None:
+                return self.filter(queryset, value, request)
+        except (ValueError, OverflowError):
+            pass
+        raise ValidationError({self.param: self.error_message})
+
+
+class IntegerFilter(QueryParamFilter):
+    error_message = 'Enter a whole number.'
+    # the range of a 64-bit integer column, larger values can't be bound as query parameters
+    min_value = -2 ** 63
+    max_value = 2 ** 63 - 1
+
+    def parse(self, value):
+        value = int(value)
+        if not self.min_value <= value <= self.max_value:
+            return None
+        return value
+
+
+class DateTimeFilter(QueryParamFilter):
+    error_message = 'Enter a valid date or date/time in ISO 8601 format.'
+
+    # accepts a full ISO 8601 timestamp or a plain date, which means midnight in the current timezone
+    def parse(self, value):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, time.min)
+
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+
+class DayFilter(QueryParamFilter):
+    error_message = 'Enter a valid date in YYYY-MM-DD format.'
+
+    def parse(self, value):
+        return parse_date(value)
+
+    # half-open range on the column rather than a __date transform, so the index can be used
+    def filter(self, queryset, value, request):
+        day_start = timezone.make_aware(datetime.combine(value, time.min))
+        return queryset.filter(**{
+            f'{self.lookup}__gte': day_start,
+            f'{self.lookup}__lt': day_start + timedelta(days=1),
+            })
+
+
+class BooleanFilter(QueryParamFilter):
+    error_message = 'Enter true or false.'
+
+    def __init__(self, param, condition):
+        super().__init__(param)
+        self.condition = condition
+
+    def parse(self, value):
+        return parse_bool(value)
+
+    def filter(self, queryset, value, request):
+        condition = self.condition(request)
+        return queryset.filter(condition) if value else queryset.exclude(condition)
+
+
+# Declarative filters for the events list. The date, past/future, created_by and has_seats filters map onto a range
+# or equality lookup served by one of the indexes declared on Event.Meta. min_capacity/max_capacity are not
+# index-backed, their rows are filtered while walking the pagination index; end_after/end_before are only served by
+# event_end_date_id_idx when the list is ordered by end_date, otherwise the page either scans the start_date index
+# or sorts the end_date matches.
+class EventFilterBackend(BaseFilterBackend):
+    filters = [
+        DayFilter('date', 'start_date'),
+        DateTimeFilter('start_after', 'start_date__gte'),
+        DateTimeFilter('start_before', 'start_date__lt'),
+        DateTimeFilter('end_after', 'end_date__gte'),
+        DateTimeFilter('end_before', 'end_date__lt'),
+        BooleanFilter('past', lambda request: Q(start_date__lt=timezone.now())),
+        BooleanFilter('future', lambda request: Q(start_date__gt=timezone.now())),
+        IntegerFilter('created_by', 'created_by_id'),
+        BooleanFilter('attending', lambda request: Q(attendees=request.user.id)),
+        BooleanFilter('has_seats', lambda request: Q(attendee_count__lt=F('capacity'))),
+        IntegerFilter('min_capacity', 'capacity__gte'),
+        IntegerFilter('max_capacity', 'capacity__lte'),
+        ]
+
+    def filter_queryset(self, request, queryset, view):
+        for query_filter in self.filters:
+            queryset = query_filter.apply(queryset, request)
+        return queryset
+
+
+class EventOrderingFilter(OrderingFilter):
+    # only orderings with a matching (column, id) index are allowed
+    ordering_fields = ['start_date', 'end_date']
+
+    # always break ties on id in the same direction, so keyset pagination stays stable
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        if ordering and ordering[0].lstrip('-') != 'id':
+            descending = ordering[0].startswith('-')
+            ordering = [ordering[0], '-id' if descending else 'id']
+        return tuple(ordering)
+
+
+# Full-text search on name and description through the configured search backend. Results come best match first
+# unless the client asks for an explicit ordering.
+class EventSearchFilter(BaseFilterBackend):
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        queryset = get_search_backend().search(queryset, query)
+        if not request.query_params.get(EventOrderingFilter.ordering_param):
+            queryset = queryset.order_by('search_rank', 'id')
+        return queryset
@@ -0,0 +1,235 @@
+import csv
+import json
+import os
+import time
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import notifications
+from .cache import invalidate_events
+from .filters import IntegerFilter
+from .models import Event
+from .registration import Attendance
+from .serializers import check_event_dates
+
+
+NAME_MAX_LENGTH = Event._meta.get_field('name').max_length
+# rejected rows kept for the final report, the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(Exception):
+    pass
+
+
+# Yields (row number, row dict or RowError) from an NDJSON or CSV file, one line at a time. In CSV files the
+# attendees column holds user ids separated by spaces or semicolons; blank NDJSON lines are skipped.
+def read_rows(path, file_format):
+    with open(path, encoding='utf-8', newline='') as file:
+        if file_format == 'csv':
+            for number, row in enumerate(csv.DictReader(file), start=1):
+                row['attendees'] = (row.get('attendees') or '').replace(';', ' ').split()
+                yield number, row
+            return
+
+        number = 0
+        for line in file:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield number, RowError(f'Invalid JSON: {error}')
+                continue
+            yield number, row if isinstance(row, dict) else RowError('Expected a JSON object.')
+
+
+def _parse_datetime(row, field):
+    value = row.get(field)
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:
+        # well formed but impossible, such as month 13
+        parsed = None
+    if parsed is None:
+        raise RowError(f'{field}: enter a valid date/time in ISO 8601 format.')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+# True for ids that can be bound as query parameters, larger values would overflow the integer column
+def _in_id_range(value):
+    return IntegerFilter.min_value <= value <= IntegerFilter.max_value
+
+
+def _parse_int(value, field):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{field}: enter a whole number.')
+    if not _in_id_range(value):
+        raise RowError(f'{field}: ensure this value is between {IntegerFilter.min_value} and '
+                       f'{IntegerFilter.max_value}.')
+    return value
+
+
+# Checks one row with the same rules as EventSerializer and returns the unsaved Event and its attendee ids.
+# `users` maps usernames and ids (as strings) of the creators referenced by the batch to user ids.
+def _build_event(row, now, users, known_user_ids):
+    name = row.get('name')
+    if not name or not isinstance(name, str):
+        raise RowError('name: this field is required.')
+    if len(name) > NAME_MAX_LENGTH:
+        raise RowError(f'name: ensure this field has no more than {NAME_MAX_LENGTH} characters.')
+
+    start_date = _parse_datetime(row, 'start_date')
+    end_date = _parse_datetime(row, 'end_date')
+    error = check_event_dates(start_date, end_date, now)
+    if error:
+        raise RowError(error)
+
+    description = row.get('description')
+    if description is not None and not isinstance(description, str):
+        raise RowError('description: expected a string or null.')
+
+    capacity = _parse_int(row.get('capacity'), 'capacity')
+    if capacity < 0:
+        raise RowError('capacity: ensure this value is greater than or equal to 0.')
+    created_by = users.get(str(row.get('created_by')))
+    if created_by is None:
+        raise RowError(f'created_by: unknown user {row.get("created_by")!r}.')
+
+    attendees = row.get('attendees') or []
+    if not isinstance(attendees, list):
+        raise RowError('attendees: expected a list of user ids.')
+    attendees = list(dict.fromkeys(_parse_int(user_id, 'attendees') for user_id in attendees))
+    unknown = [user_id for user_id in attendees if user_id not in known_user_ids]
+    if unknown:
+        raise RowError(f'attendees: unknown users {unknown}.')
+    if len(attendees) > capacity:
+        raise RowError('attendees: more attendees than capacity.')
+
+    event = Event(
+        name=name,
+        description=description or None,
+        start_date=start_date,
+        end_date=end_date,
+        capacity=capacity,
+        attendee_count=len(attendees),
+        created_by_id=created_by,
+        )
+    return event, attendees
+
+
+class EventImporter:
+    def __init__(self, batch_size=1000, allow_past=False, checkpoint=None, log=None):
+        self.batch_size = batch_size
+        self.allow_past = allow_past
+        self.checkpoint = checkpoint
+        self.log = log or (lambda message: None)
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def read_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint) as file:
+            return int(file.read().strip() or 0)
+
+    # written to a temporary file and renamed, so a crash never leaves a half-written checkpoint; called once the
+    # batch's transaction has committed
+    def write_checkpoint(self, row_number):
+        if not self.checkpoint:
+            return
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(str(row_number))
+        os.replace(temporary, self.checkpoint)
+
+    # Every batch is validated with a constant number of queries (the creators and the attendees it references)
+    # and written in its own transaction with one bulk INSERT for the events and one for the attendance rows.
+    # The checkpoint records the last row of the last committed batch, it is written after the commit.
+    def run(self, rows, resume_from=0):
+        started = time.monotonic()
+        batch = []
+        last_row = resume_from
+
+        for number, row in rows:
+            if number <= resume_from:
+                continue
+            batch.append((number, row))
+            last_row = number
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                self._report(started)
+                batch = []
+
+        if batch:
+            self._import_batch(batch)
+            self._report(started)
+        return last_row
+
+    def _report(self, started):
+        elapsed = time.monotonic() - started
+        rate = self.imported / elapsed if elapsed else 0
+        self.log(f'{self.imported} events imported, {self.failed} rejected, {rate:.0f} rows/s')
+
+    def _lookup_users(self, batch):
+        rows = [row for _, row in batch if isinstance(row, dict)]
+        creators = {str(row.get('created_by')) for row in rows if row.get('created_by') not in (None, '')}
+        creator_ids = {int(creator) for creator in creators if creator.isdigit() and _in_id_range(int(creator))}
+        users = {}
+        for user_id, username in User.objects.filter(username__in=creators).values_list('pk', 'username'):
+            users[username] = user_id
+        for user_id in User.objects.filter(pk__in=creator_ids).values_list('pk', flat=True):
+            users.setdefault(str(user_id), user_id)
+
+        attendee_ids = set()
+        for row in rows:
+            # rows with a malformed attendees value are rejected by _build_event
+            attendees = row.get('attendees')
+            for user_id in attendees if isinstance(attendees, list) else []:
+                # out-of-range ids can't match a user, _build_event rejects them
+                if str(user_id).isdigit() and _in_id_range(int(user_id)):
+                    attendee_ids.add(int(user_id))
+        known = set(User.objects.filter(pk__in=attendee_ids).values_list('pk', flat=True))
+        return users, known
+
+    def _import_batch(self, batch):
+        now = None if self.allow_past else timezone.now()
+        users, known_user_ids = self._lookup_users(batch)
+
+        events = []
+        attendees = []
+        for number, row in batch:
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                event, event_attendees = _build_event(row, now, users, known_user_ids)
+            except RowError as error:
+                self.failed += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append((number, str(error)))
+                continue
+            events.append(event)
+            attendees.append(event_attendees)
+
+        with transaction.atomic():
+            Event.objects.bulk_create(events, batch_size=self.batch_size)
+            Attendance.objects.bulk_create(
+                [Attendance(event_id=event.pk, user_id=user_id)
+                 for event, event_attendees in zip(events, attendees) for user_id in event_attendees],
+                batch_size=self.batch_size,
+                )
+            # only once the batch is committed, so --resume never skips rows that were not written
+            last_row = batch[-1][0]
+            transaction.on_commit(lambda: self.write_checkpoint(last_row))
+            notifications.notify(notifications.CREATED, [event.pk for event in events])
+
+        self.imported += len(events)
+        invalidate_events([])
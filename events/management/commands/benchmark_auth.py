@@ -0,0 +1,74 @@
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    )
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from auth.views import (
+    MyObtainTokenPairView,
+    RegisterView,
+    )
+
+
+class Command(BaseCommand):
+    help = ('Measures login and register requests per second, sent one at a time so each uses one core for its '
+            'password hash. The users are created in a transaction that is rolled back.')
+
+    password = 'Benchmark-pa55word'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Requests per endpoint (default 20).')
+        parser.add_argument('--hasher', help='Dotted path of the password hasher to use instead of the settings.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive.')
+
+        hashers = [options['hasher'], *settings.PASSWORD_HASHERS] if options['hasher'] else settings.PASSWORD_HASHERS
+        with override_settings(PASSWORD_HASHERS=hashers):
+            hasher = get_hasher()
+            with transaction.atomic():
+                login = self._run(self._login_requests(options['requests']), MyObtainTokenPairView.as_view())
+                register = self._run(self._register_requests(options['requests']), RegisterView.as_view())
+                transaction.set_rollback(True)
+
+        name = f'{type(hasher).__module__}.{type(hasher).__name__}'
+        iterations = getattr(hasher, 'iterations', None)
+        self.stdout.write(f'{name}{f" ({iterations} iterations)" if iterations else ""}, '
+                          f'{options["requests"]} requests each:')
+        for label, elapsed in (('login', login), ('register', register)):
+            rate = options['requests'] / elapsed
+            self.stdout.write(f'  {label:<9} {rate:9.1f} req/s per core {elapsed / options["requests"] * 1000:9.1f} '
+                              f'ms/request')
+
+    def _login_requests(self, count):
+        User.objects.create_user(username='benchmark-login', password=self.password)
+        factory = APIRequestFactory()
+        return [factory.post('/auth/login/', {'username': 'benchmark-login', 'password': self.password},
+                             format='json') for _ in range(count)]
+
+    def _register_requests(self, count):
+        factory = APIRequestFactory()
+        return [factory.post('/auth/register/', {
+            'username': f'benchmark-user-{i}',
+            'email': f'benchmark-user-{i}@example.com',
+            'password': self.password,
+            'password2': self.password,
+            'first_name': 'Bench',
+            'last_name': 'Mark',
+            }, format='json') for i in range(count)]
+
+    @staticmethod
+    def _run(requests, view):
+        started = time.perf_counter()
+        for request in requests:
+            response = view(request)
+            if response.status_code not in (200, 201):
+                raise CommandError(f'{request.path} answered {response.status_code}: {response.data}')
+        return time.perf_counter() - started
@@ -0,0 +1,80 @@
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    )
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from events.models import Event
+from events.serializers import (
+    EventSerializer,
+    EventValuesSerializer,
+    )
+
+
+class Command(BaseCommand):
+    help = ('Times the events list serialized by EventSerializer and by EventValuesSerializer on generated rows. '
+            'The rows are created in a transaction that is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Events to generate (default 10000).')
+        parser.add_argument('--attendees', type=int, default=3, help='Attendees per event (default 3).')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per serializer, the best one is kept.')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1 or options['attendees'] < 0:
+            raise CommandError('--rows and --repeat must be positive, --attendees not negative.')
+
+        with transaction.atomic():
+            self._generate(options['rows'], options['attendees'])
+            model, model_output = self._best(self._model_list, options['repeat'])
+            fast, fast_output = self._best(self._values_list, options['repeat'])
+            transaction.set_rollback(True)
+
+        if fast_output != model_output:
+            raise CommandError('EventValuesSerializer output differs from EventSerializer output.')
+
+        self.stdout.write(f'{options["rows"]} events, best of {options["repeat"]} (query + serialize + render):')
+        self.stdout.write(f'  EventSerializer        {model * 1000:9.1f} ms')
+        self.stdout.write(f'  EventValuesSerializer  {fast * 1000:9.1f} ms')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {model / fast:.1f}x, identical output.'))
+
+    def _generate(self, rows, attendees):
+        creator = User.objects.create(username='benchmark-creator')
+        users = User.objects.bulk_create(User(username=f'benchmark-attendee-{i}') for i in range(attendees))
+        start = timezone.now()
+        events = Event.objects.bulk_create(
+            (Event(name=f'Event {i}', description='Benchmark event', start_date=start, end_date=start,
+                   capacity=100, attendee_count=attendees, created_by=creator) for i in range(rows)),
+            batch_size=500,
+            )
+        Event.attendees.through.objects.bulk_create(
+            (Event.attendees.through(event_id=event.pk, user_id=user.pk) for event in events for user in users),
+            batch_size=500,
+            )
+
+    @staticmethod
+    def _best(run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = run()
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
+
+    # what EventViewSet.list does with EVENTS_FAST_READ_SERIALIZER = False
+    @staticmethod
+    def _model_list():
+        events = (Event.objects.select_related('created_by')
+                  .prefetch_related(Prefetch('attendees', queryset=User.objects.only('id').order_by('id')))
+                  .order_by('start_date', 'id'))
+        return JSONRenderer().render(EventSerializer(events, many=True).data)
+
+    @staticmethod
+    def _values_list():
+        rows = Event.objects.values(*EventValuesSerializer.columns(EventSerializer.Meta.fields))
+        return JSONRenderer().render(EventValuesSerializer(rows.order_by('start_date', 'id'), many=True).data)
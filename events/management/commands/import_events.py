@@ -0,0 +1,50 @@
+import os
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    )
+
+from events.importer import (
+    EventImporter,
+    read_rows,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Imports events and their attendees from an NDJSON or CSV file, in batches that can be resumed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON (one event per line) or CSV file to import.')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], dest='file_format',
+                            help='File format, guessed from the extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and written together.')
+        parser.add_argument('--allow-past', action='store_true', help='Accept events that start or end in the past.')
+        parser.add_argument('--checkpoint', help='Checkpoint file, defaults to <path>.checkpoint.')
+        parser.add_argument('--resume', action='store_true', help='Skip the rows committed by a previous run.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'File not found: {path}')
+        file_format = options['file_format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        importer = EventImporter(
+            batch_size=options['batch_size'],
+            allow_past=options['allow_past'],
+            checkpoint=options['checkpoint'] or f'{path}.checkpoint',
+            log=self.stdout.write,
+            )
+        resume_from = importer.read_checkpoint() if options['resume'] else 0
+        if resume_from:
+            self.stdout.write(f'Resuming after row {resume_from}.')
+
+        importer.run(read_rows(path, file_format), resume_from=resume_from)
+
+        for number, error in importer.errors:
+            self.stderr.write(f'Row {number}: {error}')
+        if os.path.exists(importer.checkpoint):
+            os.remove(importer.checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.imported} event(s), rejected {importer.failed} row(s).'))
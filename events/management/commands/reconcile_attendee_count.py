@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from events.registration import recount_attendees
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Event.attendee_count from the attendees table and fixes any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help='Only reconcile these events.')
+
+    def handle(self, *args, **options):
+        event_ids = options['event_ids'] or None
+
+        fixed = recount_attendees(event_ids)
+
+        checked = len(event_ids) if event_ids else Event.objects.count()
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} event(s), fixed {fixed} attendee count(s).'))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:16
+
+from django.db import migrations
+
+from events.search import (
+    install_sqlite_fts,
+    uninstall_sqlite_fts,
+    )
+
+
+def install(apps, schema_editor):
+    install_sqlite_fts(schema_editor, rebuild=True)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_sqlite_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -9,11 +9,48 @@ class Event(models.Model):
     start_date = models.DateTimeField(null=False)
     end_date = models.DateTimeField(null=False)
     capacity = models.IntegerField(null=False)
+    # denormalised number of attendees, maintained with conditional UPDATEs in events.registration
+    attendee_count = models.IntegerField(null=False, default=0)
     attendees = models.ManyToManyField('auth.User', related_name='attendees', blank=True)
     created_by = models.ForeignKey(to='auth.User', on_delete=models.DO_NOTHING, related_name='created_events')
 
+    class Meta:
+        indexes = [
+            # keyset pagination and every start_date range filter (date, past, future)
+            models.Index(fields=['start_date', 'id'], name='event_start_date_id_idx'),
+            models.Index(fields=['end_date', 'id'], name='event_end_date_id_idx'),
+            # events created by a user, in start_date order
+            models.Index(fields=['created_by', 'start_date'], name='event_creator_start_idx'),
+            # partial index over events that still have seats, for ?has_seats=true
+            models.Index(fields=['start_date', 'id'], condition=models.Q(attendee_count__lt=models.F('capacity')),
+                         name='event_has_seats_start_idx'),
+            ]
+
     def __str__(self):
         return self.name
 
+    @property
+    def seats_remaining(self):
+        return max(self.capacity - self.attendee_count, 0)
+
     def get_attendees(self):
         return "\n".join([a.username for a in self.attendees.all()])
+
+
+# A user queued for a seat of a full event. The auto-increment id is the queue position: it only grows, so an
+# event's queue is the (event, id) index in order and its head is a single index seek.
+class WaitlistEntry(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='waitlist_entries')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'user'], name='waitlist_event_user_unique'),
+            ]
+        indexes = [
+            models.Index(fields=['event', 'id'], name='waitlist_event_queue_idx'),
+            ]
+
+    def __str__(self):
+        return f'{self.user_id} waiting for {self.event_id}'
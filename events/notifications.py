@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+REGISTERED = 'registered'
+UNREGISTERED = 'unregistered'
+TYPES = (CREATED, UPDATED, DELETED, REGISTERED, UNREGISTERED)
+# sent instead of the pending messages when a subscriber falls behind, the client should refetch what it shows
+RESET = 'reset'
+
+# messages a subscriber may have pending before it is reset
+MAX_PENDING = 100
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+# One stream's interest in notifications: the event ids and message types it wants, None for all of them. It
+# belongs to the event loop that created it; publishers in other threads hand messages over with
+# call_soon_threadsafe.
+class Subscription:
+    def __init__(self, event_ids=None, types=None, max_pending=MAX_PENDING):
+        self.event_ids = frozenset(event_ids) if event_ids else None
+        self.types = frozenset(types) if types else None
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_pending)
+
+    # the part of `message` this subscription wants, or None
+    def match(self, message):
+        if self.types is not None and message['type'] not in self.types:
+            return None
+        if self.event_ids is None:
+            return message
+
+        event_ids = [event_id for event_id in message['event_ids'] if event_id in self.event_ids]
+        if not event_ids:
+            return None
+        return {**message, 'event_ids': event_ids}
+
+    def offer(self, message):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': RESET, 'event_ids': []})
+
+    async def get(self):
+        return await self.queue.get()
+
+
+# Fans messages out to the subscriptions of this process. `publish()` is what the application calls once a change
+# is committed; a backend for several processes sends the message to all of them (through Redis, Postgres
+# LISTEN/NOTIFY...) and each process passes what it receives to `deliver()`.
+class NotificationBackend:
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, message):
+        raise NotImplementedError
+
+    def deliver(self, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            matched = subscription.match(message)
+            if matched is None:
+                continue
+            try:
+                subscription.offer(matched)
+            except RuntimeError:
+                # the subscriber's event loop is gone
+                self.unsubscribe(subscription)
+
+
+# Single process: published messages go straight to the local subscriptions.
+class LocalNotificationBackend(NotificationBackend):
+    def publish(self, message):
+        self.deliver(message)
+
+
+# the process-wide backend, the class named by EVENTS_NOTIFICATION_BACKEND
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'EVENTS_NOTIFICATION_BACKEND', 'events.notifications.LocalNotificationBackend')
+                _backend = import_string(path)()
+    return _backend
+
+
+# Publishes a change of the given events once the current transaction commits (right away outside of one).
+def notify(type, event_ids, **data):
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+
+    message = {'type': type, 'event_ids': event_ids, **data}
+    transaction.on_commit(lambda: get_backend().publish(message))
@@ -0,0 +1,167 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import (
+    NotFound,
+    ValidationError,
+    )
+from rest_framework.pagination import (
+    CursorPagination,
+    PageNumberPagination,
+    )
+
+
+class EventCursorPagination(CursorPagination):
+    # keyset pagination on (start_date, id): the cursor holds both values of the row it continues from and every
+    # page is a single indexed range scan without OFFSET, so the cost of fetching a page does not depend on how
+    # deep the client is paging, however many events share a start_date
+    ordering = ('start_date', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    # separates the ordering values in a cursor position, never part of a date or an id
+    position_separator = '|'
+
+    # DRF's paginate_queryset, split around its only query so the async views can await that query
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._paginate_results(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._paginate_results([item async for item in queryset])
+
+    # the slice holding the page plus one row, which tells whether a following page exists
+    def _page_queryset(self, queryset, request, view):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self._reverse, self._current_position = False, None
+        else:
+            self._reverse, self._current_position = self.cursor.reverse, self.cursor.position
+
+        if self._reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+            queryset = queryset.order_by(*ordering)
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self._current_position is not None:
+            queryset = queryset.filter(self._after_position(queryset.model, self._current_position))
+
+        return queryset[:self.page_size + 1]
+
+    # rows strictly after `position` in the scan direction: (a > x) OR (a = x AND b > y), with `<` for descending
+    # fields, flipped when paging backwards
+    def _after_position(self, model, position):
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(value)
+            except DjangoValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if field.startswith('-') != self._reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    # the values of every ordering field, the last one (id) makes each position unique
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            values.append(str(instance[name] if isinstance(instance, dict) else getattr(instance, name)))
+        return self.position_separator.join(values)
+
+    def _paginate_results(self, results):
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        has_current_position = self._current_position is not None
+        if self._reverse:
+            self.page = list(reversed(self.page))
+            self.has_next, self.has_previous = has_current_position, has_following_position
+            self.next_position, self.previous_position = self._current_position, following_position
+        else:
+            self.has_next, self.has_previous = has_following_position, has_current_position
+            self.next_position, self.previous_position = following_position, self._current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class EventSearchPagination(PageNumberPagination):
+    # search results are ordered by relevance, which has no stable keyset, and clients rarely page deep into them
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    # paginate_queryset with the count and the page read through the async ORM
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [item async for item in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
+
+
+class AttendeeCursorPagination(CursorPagination):
+    # keyset pagination over the attendance (through) table: user ids are unique per event and usernames are unique,
+    # so both are valid cursors and a page never needs an OFFSET
+    ordering = 'user_id'
+    ordering_param = 'ordering'
+    ordering_fields = {
+        'user_id': 'user_id',
+        'username': 'user__username',
+        }
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    # the ordering comes from ?ordering= directly, the event viewset's ordering filter knows nothing about attendees
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param, '').strip()
+        if not value:
+            return (self.ordering,)
+
+        descending = value.startswith('-')
+        field = self.ordering_fields.get(value.lstrip('-'))
+        if field is None:
+            raise ValidationError({self.ordering_param: [f'Choose one of: {", ".join(self.ordering_fields)}.']})
+        return (f'-{field}' if descending else field,)
@@ -0,0 +1,336 @@
+from django.contrib.auth.models import User
+from django.db import (
+    IntegrityError,
+    transaction,
+    )
+from django.db.models import (
+    Count,
+    F,
+    OuterRef,
+    Subquery,
+    )
+from django.db.models.functions import (
+    Coalesce,
+    Greatest,
+    )
+from django.utils import timezone
+
+from . import notifications
+from .cache import (
+    invalidate_event,
+    invalidate_events,
+    )
+from .models import (
+    Event,
+    WaitlistEntry,
+    )
+
+
+REGISTERED = 'registered'
+UNREGISTERED = 'unregistered'
+ALREADY_REGISTERED = 'already_registered'
+NOT_REGISTERED = 'not_registered'
+FULL = 'full'
+STARTED = 'started'
+UNKNOWN_USER = 'unknown_user'
+UNKNOWN_EVENT = 'unknown_event'
+WAITLISTED = 'waitlisted'
+ALREADY_WAITLISTED = 'already_waitlisted'
+NOT_WAITLISTED = 'not_waitlisted'
+LEFT_WAITLIST = 'left_waitlist'
+
+# a concurrent registration of the same user can make a bulk insert conflict, the batch is then recomputed
+BULK_ATTEMPTS = 3
+
+Attendance = Event.attendees.through
+
+
+# Reserves a seat with a single conditional UPDATE on the denormalised attendee_count, so concurrent workers can
+# never push the count past capacity. The attendance row is inserted in the same transaction; its unique
+# (event, user) constraint rolls the reservation back when the user is already registered.
+def register_attendee(event_id, user_id):
+    now = timezone.now()
+
+    try:
+        with transaction.atomic():
+            reserved = Event.objects.filter(
+                pk=event_id,
+                attendee_count__lt=F('capacity'),
+                start_date__gt=now,
+                ).update(attendee_count=F('attendee_count') + 1, updated=now)
+
+            if reserved:
+                Attendance.objects.create(event_id=event_id, user_id=user_id)
+                invalidate_event(event_id)
+                notifications.notify(notifications.REGISTERED, [event_id], user_ids=[user_id])
+                return REGISTERED
+    except IntegrityError:
+        return ALREADY_REGISTERED
+
+    # the reservation failed, only now look at the row to tell the caller why
+    event = Event.objects.values('attendee_count', 'capacity').get(pk=event_id)
+    if event['attendee_count'] >= event['capacity']:
+        return FULL
+    return STARTED
+
+
+# Releases the seat held by the user, if any, and hands it to the head of the event's waitlist in the same
+# transaction.
+def unregister_attendee(event_id, user_id):
+    now = timezone.now()
+
+    with transaction.atomic():
+        deleted, _ = Attendance.objects.filter(event_id=event_id, user_id=user_id).delete()
+        if not deleted:
+            return NOT_REGISTERED
+
+        Event.objects.filter(pk=event_id, attendee_count__gt=0).update(
+            attendee_count=F('attendee_count') - 1, updated=now)
+        invalidate_event(event_id)
+        notifications.notify(notifications.UNREGISTERED, [event_id], user_ids=[user_id])
+        _promote_next(event_id, now)
+
+    return UNREGISTERED
+
+
+# Registers the user if a seat is free, otherwise queues them at the end of the event's waitlist.
+def join_waitlist(event_id, user_id):
+    result = register_attendee(event_id, user_id)
+    if result != FULL:
+        return result
+    # register_attendee reports a full event as full even once it has started, never queue for one
+    if Event.objects.filter(pk=event_id, start_date__lte=timezone.now()).exists():
+        return STARTED
+    # a full event fails the reservation before the attendance row could tell
+    if Attendance.objects.filter(event_id=event_id, user_id=user_id).exists():
+        return ALREADY_REGISTERED
+
+    try:
+        with transaction.atomic():
+            WaitlistEntry.objects.create(event_id=event_id, user_id=user_id)
+    except IntegrityError:
+        return ALREADY_WAITLISTED
+
+    # a seat freed between the reservation attempt and the insert found the waitlist empty
+    return REGISTERED if user_id in promote_waitlist(event_id) else WAITLISTED
+
+
+def leave_waitlist(event_id, user_id):
+    deleted, _ = WaitlistEntry.objects.filter(event_id=event_id, user_id=user_id).delete()
+    return LEFT_WAITLIST if deleted else NOT_WAITLISTED
+
+
+# 1-based place of the user in the event's waitlist, None when they are not on it
+def waitlist_position(event_id, user_id):
+    entry_id = WaitlistEntry.objects.filter(event_id=event_id, user_id=user_id).values_list('pk', flat=True).first()
+    if entry_id is None:
+        return None
+    return WaitlistEntry.objects.filter(event_id=event_id, pk__lte=entry_id).count()
+
+
+# Fills the free seats of an event from its waitlist, e.g. after its capacity was raised. Returns the promoted
+# user ids.
+def promote_waitlist(event_id):
+    now = timezone.now()
+    promoted = []
+    with transaction.atomic():
+        while (user_id := _promote_next(event_id, now)) is not None:
+            promoted.append(user_id)
+    return promoted
+
+
+# Moves the head of the waitlist into a free seat, a constant number of queries: the head is the first row of the
+# (event, id) index, deleting it claims it against concurrent promotions, and the seat is reserved with the same
+# conditional UPDATE as register_attendee. Nothing changes when the event has no free seat or has started. Must
+# run in a transaction; returns the promoted user id or None.
+def _promote_next(event_id, now):
+    while True:
+        head = WaitlistEntry.objects.filter(event_id=event_id).order_by('pk').values_list('pk', 'user_id').first()
+        if head is None:
+            return None
+        entry_id, user_id = head
+
+        with transaction.atomic():
+            claimed, _ = WaitlistEntry.objects.filter(pk=entry_id).delete()
+            if not claimed:
+                # promoted by a concurrent transaction
+                continue
+            try:
+                with transaction.atomic():
+                    Attendance.objects.create(event_id=event_id, user_id=user_id)
+            except IntegrityError:
+                # registered directly in the meantime, the entry stays deleted
+                continue
+
+            reserved = Event.objects.filter(
+                pk=event_id,
+                attendee_count__lt=F('capacity'),
+                start_date__gt=now,
+                ).update(attendee_count=F('attendee_count') + 1, updated=now)
+            if not reserved:
+                transaction.set_rollback(True)
+                return None
+
+        invalidate_event(event_id)
+        notifications.notify(notifications.REGISTERED, [event_id], user_ids=[user_id])
+        return user_id
+
+
+def _unique(ids):
+    return list(dict.fromkeys(ids))
+
+
+def _retry_on_conflict(function):
+    for attempt in range(BULK_ATTEMPTS):
+        try:
+            return function()
+        except IntegrityError:
+            if attempt == BULK_ATTEMPTS - 1:
+                raise
+
+
+# Registers many users for one event in a single transaction: one query to drop unknown and already registered
+# users, one conditional UPDATE that reserves the seats of the whole batch at once, one bulk INSERT. The batch
+# either fits in the remaining seats or none of it is registered. Returns {user_id: result}.
+def register_attendees(event_id, user_ids):
+    user_ids = _unique(user_ids)
+    return _retry_on_conflict(lambda: _register_attendees(event_id, user_ids))
+
+
+def _register_attendees(event_id, user_ids):
+    now = timezone.now()
+
+    with transaction.atomic():
+        known = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        registered = set(Attendance.objects.filter(event_id=event_id, user_id__in=user_ids).values_list(
+            'user_id', flat=True))
+        new = [user_id for user_id in user_ids if user_id in known and user_id not in registered]
+
+        results = {user_id: UNKNOWN_USER for user_id in user_ids if user_id not in known}
+        results.update({user_id: ALREADY_REGISTERED for user_id in registered})
+        if not new:
+            return {user_id: results[user_id] for user_id in user_ids}
+
+        reserved = Event.objects.filter(
+            pk=event_id,
+            attendee_count__lte=F('capacity') - len(new),
+            start_date__gt=now,
+            ).update(attendee_count=F('attendee_count') + len(new), updated=now)
+
+        if reserved:
+            Attendance.objects.bulk_create([Attendance(event_id=event_id, user_id=user_id) for user_id in new])
+            invalidate_event(event_id)
+            notifications.notify(notifications.REGISTERED, [event_id], user_ids=new)
+            outcome = REGISTERED
+        else:
+            event = Event.objects.values('start_date').get(pk=event_id)
+            outcome = STARTED if event['start_date'] <= now else FULL
+
+    results.update({user_id: outcome for user_id in new})
+    return {user_id: results[user_id] for user_id in user_ids}
+
+
+# Unregisters many users from one event: one DELETE and one counter UPDATE, then the freed seats go to the
+# waitlist. Returns {user_id: result}.
+def unregister_attendees(event_id, user_ids):
+    user_ids = _unique(user_ids)
+    now = timezone.now()
+
+    with transaction.atomic():
+        registered = set(Attendance.objects.filter(event_id=event_id, user_id__in=user_ids).values_list(
+            'user_id', flat=True))
+        if registered:
+            deleted, _ = Attendance.objects.filter(event_id=event_id, user_id__in=registered).delete()
+            Event.objects.filter(pk=event_id).update(
+                attendee_count=Greatest(F('attendee_count') - deleted, 0), updated=now)
+            invalidate_event(event_id)
+            notifications.notify(notifications.UNREGISTERED, [event_id], user_ids=sorted(registered))
+            for _ in range(deleted):
+                if _promote_next(event_id, now) is None:
+                    break
+
+    return {user_id: UNREGISTERED if user_id in registered else NOT_REGISTERED for user_id in user_ids}
+
+
+# Registers one user for many events in a single transaction. Each seat is still reserved with its own
+# conditional UPDATE, the attendance rows are written with one bulk INSERT. Returns {event_id: result}.
+def register_events(user_id, event_ids):
+    event_ids = _unique(event_ids)
+    return _retry_on_conflict(lambda: _register_events(user_id, event_ids))
+
+
+def _register_events(user_id, event_ids):
+    now = timezone.now()
+
+    with transaction.atomic():
+        events = {event['pk']: event for event in Event.objects.filter(pk__in=event_ids).values(
+            'pk', 'start_date')}
+        registered = set(Attendance.objects.filter(user_id=user_id, event_id__in=event_ids).values_list(
+            'event_id', flat=True))
+
+        results = {}
+        reserved = []
+        for event_id in event_ids:
+            if event_id not in events:
+                results[event_id] = UNKNOWN_EVENT
+            elif event_id in registered:
+                results[event_id] = ALREADY_REGISTERED
+            elif events[event_id]['start_date'] <= now:
+                results[event_id] = STARTED
+            elif Event.objects.filter(pk=event_id, attendee_count__lt=F('capacity'), start_date__gt=now).update(
+                    attendee_count=F('attendee_count') + 1, updated=now):
+                results[event_id] = REGISTERED
+                reserved.append(event_id)
+            else:
+                results[event_id] = FULL
+
+        if reserved:
+            Attendance.objects.bulk_create([Attendance(event_id=event_id, user_id=user_id) for event_id in reserved])
+            invalidate_events(reserved)
+            notifications.notify(notifications.REGISTERED, reserved, user_ids=[user_id])
+
+    return results
+
+
+# Unregisters one user from many events: one DELETE and one counter UPDATE, then each freed seat goes to the
+# event's waitlist. Returns {event_id: result}.
+def unregister_events(user_id, event_ids):
+    event_ids = _unique(event_ids)
+    now = timezone.now()
+
+    with transaction.atomic():
+        registered = set(Attendance.objects.filter(user_id=user_id, event_id__in=event_ids).values_list(
+            'event_id', flat=True))
+        if registered:
+            Attendance.objects.filter(user_id=user_id, event_id__in=registered).delete()
+            Event.objects.filter(pk__in=registered).update(
+                attendee_count=Greatest(F('attendee_count') - 1, 0), updated=now)
+            invalidate_events(registered)
+            notifications.notify(notifications.UNREGISTERED, sorted(registered), user_ids=[user_id])
+            for event_id in sorted(registered):
+                _promote_next(event_id, now)
+
+    return {event_id: UNREGISTERED if event_id in registered else NOT_REGISTERED for event_id in event_ids}
+
+
+# Recomputes attendee_count from the attendance table, used to resync after admin edits and by the
+# reconcile_attendee_count command. Rows that change also move `updated`, so their ETags change. With `touch`
+# every event of `event_ids` moves it in the same UPDATE, for callers that changed the attendee list itself.
+# Returns the number of rows whose counter was out of date.
+def recount_attendees(event_ids=None, touch=False):
+    counts = Attendance.objects.filter(event_id=OuterRef('pk')).values('event_id').annotate(
+        total=Count('pk')).values('total')
+    actual = Coalesce(Subquery(counts), 0)
+
+    queryset = Event.objects.all()
+    if event_ids is not None:
+        queryset = queryset.filter(pk__in=event_ids)
+
+    drifted = list(queryset.annotate(actual=actual).exclude(attendee_count=F('actual')).values_list('pk', flat=True))
+    changed = list(event_ids) if touch else drifted
+    if changed:
+        Event.objects.filter(pk__in=changed).update(attendee_count=actual, updated=timezone.now())
+        invalidate_events(changed)
+    if drifted:
+        notifications.notify(notifications.UPDATED, drifted)
+    return len(drifted)
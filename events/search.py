@@ -0,0 +1,110 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import (
+    Q,
+    Value,
+    )
+from django.utils.module_loading import import_string
+
+
+FTS_TABLE = 'events_event_fts'
+
+SQLITE_FTS_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, content='events_event', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS events_event_fts_insert AFTER INSERT ON events_event BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS events_event_fts_delete AFTER DELETE ON events_event BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS events_event_fts_update AFTER UPDATE OF name, description ON events_event
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    ]
+
+SQLITE_FTS_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS events_event_fts_insert',
+    'DROP TRIGGER IF EXISTS events_event_fts_delete',
+    'DROP TRIGGER IF EXISTS events_event_fts_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    ]
+
+
+# Creates the FTS5 index and the triggers that keep it in sync with events_event. Idempotent: it also runs after
+# every migrate, because SQLite migrations that rebuild events_event drop the triggers along with the old table.
+def install_sqlite_fts(schema_editor, rebuild=False):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for statement in SQLITE_FTS_SETUP:
+        schema_editor.execute(statement)
+    if rebuild:
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_sqlite_fts(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for statement in SQLITE_FTS_TEARDOWN:
+        schema_editor.execute(statement)
+
+
+class SearchBackend:
+    # Filters `queryset` down to the events matching `query` and annotates them with `search_rank`,
+    # lower values being better matches.
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    # bm25 column weights for (name, description): a hit in the name counts ten times more
+    weights = (10.0, 1.0)
+
+    # quotes every token so user input can't inject FTS5 query syntax, the last one also matches as a prefix
+    @staticmethod
+    def build_match(query):
+        tokens = re.findall(r'\w+', query)
+        if not tokens:
+            return None
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if match is None:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return queryset.extra(
+            select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = events_event.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            )
+
+
+# Portable fallback for databases without a dedicated backend. Every match has the same rank.
+class SubstringSearchBackend(SearchBackend):
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query),
+            ).annotate(search_rank=Value(0.0))
+
+
+# EVENTS_SEARCH_BACKEND may name a SearchBackend subclass by dotted path; by default SQLite databases use FTS5.
+def get_search_backend():
+    backend = getattr(settings, 'EVENTS_SEARCH_BACKEND', None)
+    if backend:
+        return import_string(backend)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSSearchBackend()
+    return SubstringSearchBackend()
@@ -1,26 +1,215 @@
-from datetime import datetime
-import pytz
-from rest_framework import serializers
+import datetime
+from operator import itemgetter
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import (
+    ISO_8601,
+    serializers,
+    )
+from rest_framework.settings import api_settings
 
 from .models import Event
 
 
-class EventSerializer(serializers.ModelSerializer):
+# Date rules shared by the API serializers and the bulk importer. `start_date`/`end_date` that are None were not
+# provided (partial update) and are only checked against each other when both are known. With `now` None the
+# dates may be in the past.
+def check_event_dates(start_date, end_date, now, existing_start_date=None, existing_end_date=None):
+    if now is not None and start_date is not None and start_date < now:
+        return "Event can't start in the past."
+
+    if now is not None and end_date is not None and end_date < now:
+        return "Event can't end in the past."
+
+    start_date = start_date if start_date is not None else existing_start_date
+    end_date = end_date if end_date is not None else existing_end_date
+    if start_date is not None and end_date is not None and start_date > end_date:
+        return "Event can't end before it starts."
+
+    return None
+
+
+# Serializer mixin taking an optional `fields` argument, the names of the fields to keep.
+class DynamicFieldsMixin:
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+# database columns each representation field reads, so sparse responses only load what they need
+EVENT_FIELD_COLUMNS = {
+    'pk': [],
+    'name': ['name'],
+    'start_date': ['start_date'],
+    'end_date': ['end_date'],
+    'description': ['description'],
+    'capacity': ['capacity'],
+    'attendees': [],
+    'attendee_count': ['attendee_count'],
+    'seats_remaining': ['capacity', 'attendee_count'],
+    'created_by': ['created_by__username'],
+    'created': ['created'],
+    'updated': ['updated'],
+    }
+
+
+class EventSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     created_by = serializers.CharField(source='created_by.username', required=False)
+    seats_remaining = serializers.ReadOnlyField()
 
     class Meta:
         model = Event
-        fields = ['pk', 'name', 'start_date', 'end_date', 'description', 'capacity', 'attendees', 'created_by',
-                  'created', 'updated']
+        fields = ['pk', 'name', 'start_date', 'end_date', 'description', 'capacity', 'attendees', 'attendee_count',
+                  'seats_remaining', 'created_by', 'created', 'updated']
+        # attendance only changes through events.registration, which enforces capacity and the start date
+        read_only_fields = ['attendees', 'attendee_count']
 
+    # the views put a single `now` in the context, so a whole batch is validated against the same instant
     def validate(self, data):
-        if data['start_date'] < datetime.now().replace(tzinfo=pytz.utc):
-            raise serializers.ValidationError("Event can't start in the past.")
+        error = check_event_dates(
+            data.get('start_date'),
+            data.get('end_date'),
+            self.context.get('now') or timezone.now(),
+            getattr(self.instance, 'start_date', None),
+            getattr(self.instance, 'end_date', None),
+            )
+        if error:
+            raise serializers.ValidationError(error)
 
-        if data['end_date'] < datetime.now().replace(tzinfo=pytz.utc):
-            raise serializers.ValidationError("Event can't end in the past.")
+        return data
 
-        if data['start_date'] > data['end_date']:
-            raise serializers.ValidationError("Event can't end before it starts.")
 
-        return data
+# list representation without the attendee ids and the description, which make up most of a large payload
+class EventCompactSerializer(EventSerializer):
+    class Meta(EventSerializer.Meta):
+        fields = ['pk', 'name', 'start_date', 'end_date', 'capacity', 'attendee_count', 'seats_remaining',
+                  'created_by', 'created', 'updated']
+
+
+# Formatter with the output of DRF's DateTimeField.to_representation, minus the per-value settings lookups. Values
+# already in the current timezone are not converted again; the database hands back UTC, so with TIME_ZONE = 'UTC'
+# most values go straight to isoformat().
+def datetime_formatter():
+    if api_settings.DATETIME_FORMAT is None or api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+        return serializers.DateTimeField().to_representation
+
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    if getattr(tz, 'key', None) == 'UTC':
+        tz = datetime.timezone.utc
+
+    def to_iso(value):
+        if value is None:
+            return None
+        if tz is not None and value.tzinfo is not tz:
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            return value[:-6] + 'Z'
+        return value
+
+    return to_iso
+
+
+# attendee ids of each row, in user id order, read from the attendance table with a single query
+def attach_attendee_ids(rows):
+    _attach(rows, list(_attendee_pairs(rows)))
+
+
+async def aattach_attendee_ids(rows):
+    _attach(rows, [pair async for pair in _attendee_pairs(rows)])
+
+
+def _attendee_pairs(rows):
+    return (Event.attendees.through.objects.filter(event_id__in=[row['id'] for row in rows])
+            .order_by('event_id', 'user_id').values_list('event_id', 'user_id'))
+
+
+def _attach(rows, pairs):
+    attendees = {row['id']: [] for row in rows}
+    for event_id, user_id in pairs:
+        attendees[event_id].append(user_id)
+    for row in rows:
+        row['attendees'] = attendees[row['id']]
+
+
+class EventValuesListSerializer(serializers.ListSerializer):
+    # rows that already carry their attendee ids (see aattach_attendee_ids) are not looked up again
+    def to_representation(self, data):
+        rows = list(data)
+        if self.child.with_attendees and rows and 'attendees' not in rows[0]:
+            attach_attendee_ids(rows)
+        return [self.child.to_representation(row) for row in rows]
+
+
+# Read-only counterpart of EventSerializer over `.values()` rows (see `columns()`), with the same output. Every field
+# is resolved to a plain accessor once, so a row costs one dict build instead of a get_attribute/to_representation
+# round trip per field.
+class EventValuesSerializer(EventSerializer):
+    class Meta(EventSerializer.Meta):
+        list_serializer_class = EventValuesListSerializer
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.representation_fields = [name for name in self.Meta.fields if fields is None or name in fields]
+        self.with_attendees = 'attendees' in self.representation_fields
+        to_iso = datetime_formatter()
+
+        accessors = {
+            'pk': itemgetter('id'),
+            'created_by': itemgetter('created_by__username'),
+            'seats_remaining': lambda row: max(row['capacity'] - row['attendee_count'], 0),
+            'start_date': lambda row: to_iso(row['start_date']),
+            'end_date': lambda row: to_iso(row['end_date']),
+            'created': lambda row: to_iso(row['created']),
+            'updated': lambda row: to_iso(row['updated']),
+            }
+        self.accessors = [(name, accessors.get(name) or itemgetter(name)) for name in self.representation_fields]
+
+    # the `.values()` columns needed for `fields`, plus the keys the cursor paginator reads
+    @staticmethod
+    def columns(fields):
+        columns = {'id', 'start_date', 'end_date'}
+        for name in fields:
+            columns.update(EVENT_FIELD_COLUMNS[name])
+        return sorted(columns)
+
+    def to_representation(self, instance):
+        if self.with_attendees and 'attendees' not in instance:
+            attach_attendee_ids([instance])
+        return {name: accessor(instance) for name, accessor in self.accessors}
+
+
+class EventBulkListSerializer(serializers.ListSerializer):
+    # rows per INSERT statement
+    batch_size = 500
+
+    def create(self, validated_data):
+        events = [Event(**row) for row in validated_data]
+        return Event.objects.bulk_create(events, batch_size=self.batch_size)
+
+
+# plain columns only, so rows can be written with bulk_create/bulk_update
+class EventBulkSerializer(EventSerializer):
+    class Meta:
+        model = Event
+        fields = ['pk', 'name', 'start_date', 'end_date', 'description', 'capacity']
+        list_serializer_class = EventBulkListSerializer
+
+
+# rows of the attendance table read with .values('user_id', 'user__username'), no User instances involved
+class AttendeeSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    username = serializers.CharField(source='user__username')
+
+
+# payloads of the bulk registration endpoints
+class UserIdsSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+
+
+class EventIdsSerializer(serializers.Serializer):
+    event_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
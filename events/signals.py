@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    )
+from django.dispatch import receiver
+
+from auth.authentication import forget_cached_user
+
+from . import notifications
+from .cache import invalidate_events
+from .models import Event
+from .registration import recount_attendees
+from .search import (
+    FTS_TABLE,
+    install_sqlite_fts,
+    )
+
+
+# `event.attendees.add/remove/set/clear()` (the admin form uses `set()`) bypasses events.registration,
+# so resync the denormalised counter for the events touched. The registration module writes the through
+# table directly and never triggers this handler.
+@receiver(m2m_changed, sender=Event.attendees.through)
+def sync_attendee_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # the cleared events are unknown after the fact, remember them for post_clear
+        instance._cleared_event_ids = list(instance.attendees.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == 'post_clear':
+        event_ids = getattr(instance, '_cleared_event_ids', [])
+    else:
+        event_ids = pk_set
+
+    if event_ids:
+        # the attendee list is part of the representation, `touch` moves `updated` even when the count is unchanged
+        recount_attendees(event_ids, touch=True)
+
+        if action == 'post_clear':
+            notifications.notify(notifications.UPDATED, event_ids)
+        elif pk_set:
+            type = notifications.REGISTERED if action == 'post_add' else notifications.UNREGISTERED
+            user_ids = [instance.pk] if reverse else sorted(pk_set)
+            notifications.notify(type, sorted(event_ids), user_ids=user_ids)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    invalidate_events([instance.pk])
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def notify_event_change(sender, instance, created=False, **kwargs):
+    if kwargs['signal'] is post_delete:
+        type = notifications.DELETED
+    else:
+        type = notifications.CREATED if created else notifications.UPDATED
+    notifications.notify(type, [instance.pk])
+
+
+# the auth package is not an installed app, its User receivers are connected here
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user_row(sender, instance, **kwargs):
+    forget_cached_user(instance.pk)
+
+
+# SQLite migrations that rebuild events_event drop its triggers, put the search index triggers back
+@receiver(post_migrate)
+def ensure_search_index(sender, using, **kwargs):
+    if sender.name != 'events':
+        return
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        with connection.schema_editor() as schema_editor:
+            install_sqlite_fts(schema_editor)
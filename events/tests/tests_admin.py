@@ -0,0 +1,113 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from events.admin import (
+    AttendancePageFormSet,
+    EstimatedCountPaginator,
+    )
+from events.models import Event
+
+
+class EventAdminTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(self.admin)
+        self.users = [User.objects.create(username=f'user{i}') for i in range(5)]
+
+    def _create(self, count, attendees=()):
+        start = timezone.now() + timedelta(days=1)
+        events = []
+        for i in range(count):
+            event = Event.objects.create(name=f'Event {i}', start_date=start, end_date=start + timedelta(hours=1),
+                                         capacity=100, created_by=self.users[i % len(self.users)])
+            event.attendees.add(*attendees)
+            events.append(event)
+        return events
+
+    def _changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/admin/events/event/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self._create(2, self.users[:1])
+        few = self._changelist_queries()
+
+        self._create(20, self.users)
+        self.assertEqual(self._changelist_queries(), few)
+
+    def test_changelist_filters(self):
+        self._create(3)
+
+        response = self.client.get('/admin/events/event/', {'created_by__id__exact': self.users[0].pk})
+
+        self.assertEqual(response.context['cl'].result_count, 1)
+        self.assertContains(response, 'attendee_count')
+
+    def test_attendee_inline_is_paged(self):
+        event, = self._create(1, self.users)
+        url = f'/admin/events/event/{event.pk}/change/'
+
+        with mock.patch.object(AttendancePageFormSet, 'per_page', 2):
+            first = self.client.get(url)
+            last = self.client.get(url, {'attendees_page': 3})
+
+        formset = first.context['inline_admin_formsets'][0].formset
+        self.assertEqual([form.instance.user_id for form in formset.initial_forms], [u.pk for u in self.users[:2]])
+        self.assertContains(first, 'attendees_page=3')
+        formset = last.context['inline_admin_formsets'][0].formset
+        self.assertEqual([form.instance.user_id for form in formset.initial_forms], [self.users[4].pk])
+
+    def test_inline_changes_resync_attendee_count(self):
+        event, = self._create(1, self.users[:2])
+        rows = list(Event.attendees.through.objects.filter(event=event).order_by('pk'))
+        prefix = 'Event_attendees-'
+        data = {
+            'name': event.name,
+            'start_date_0': event.start_date.strftime('%Y-%m-%d'),
+            'start_date_1': event.start_date.strftime('%H:%M:%S'),
+            'end_date_0': event.end_date.strftime('%Y-%m-%d'),
+            'end_date_1': event.end_date.strftime('%H:%M:%S'),
+            'capacity': 100,
+            'created_by': event.created_by_id,
+            f'{prefix}TOTAL_FORMS': 2,
+            f'{prefix}INITIAL_FORMS': 2,
+            }
+        for i, row in enumerate(rows):
+            data.update({f'{prefix}{i}-id': row.pk, f'{prefix}{i}-event': event.pk, f'{prefix}{i}-user': row.user_id})
+        data[f'{prefix}0-DELETE'] = 'on'
+
+        response = self.client.post(f'/admin/events/event/{event.pk}/change/', data)
+
+        self.assertEqual(response.status_code, 302)
+        event.refresh_from_db()
+        self.assertEqual(event.attendee_count, 1)
+        self.assertEqual(list(event.attendees.values_list('pk', flat=True)), [self.users[1].pk])
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        user = User.objects.create(username='creator')
+        start = timezone.now()
+        Event.objects.bulk_create(Event(name=f'Event {i}', start_date=start, end_date=start, capacity=1,
+                                        created_by=user) for i in range(3))
+
+    def test_counts_exactly_without_an_estimate(self):
+        self.assertEqual(EstimatedCountPaginator(Event.objects.order_by('pk'), 2).count, 3)
+
+    def test_uses_large_estimates(self):
+        with mock.patch.object(EstimatedCountPaginator, '_estimate', return_value=250000):
+            self.assertEqual(EstimatedCountPaginator(Event.objects.order_by('pk'), 2).count, 250000)
+        with mock.patch.object(EstimatedCountPaginator, '_estimate', return_value=50):
+            self.assertEqual(EstimatedCountPaginator(Event.objects.order_by('pk'), 2).count, 3)
+
+    def test_filtered_lists_are_not_estimated(self):
+        paginator = EstimatedCountPaginator(Event.objects.filter(capacity=1).order_by('pk'), 2)
+
+        self.assertIsNone(paginator._estimate())
@@ -0,0 +1,153 @@
+from datetime import timedelta
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import (
+    AsyncClient,
+    Client,
+    TestCase,
+    override_settings,
+    )
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from auth.serializers import MyTokenObtainPairSerializer
+from events import cache
+from events.models import Event
+
+
+class AsyncEventViewsTest(TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create(username='testuser')
+        self.token = str(MyTokenObtainPairSerializer.get_token(self.user).access_token)
+        self.client = AsyncClient()
+        start = timezone.now() + timedelta(days=1)
+        self.events = [
+            Event.objects.create(name=f'Event {i}', description='Async event', start_date=start + timedelta(hours=i),
+                                 end_date=start + timedelta(hours=i + 1), capacity=2, created_by=self.user)
+            for i in range(3)
+            ]
+        self.events[0].attendees.add(self.user)
+
+    # per-request headers, AsyncClient ignores client-wide ones in Django 4.2
+    def get(self, url, params=None, token=None):
+        return self.client.get(url, params, headers={'Authorization': f'Bearer {token or self.token}'})
+
+    def post(self, url):
+        return self.client.post(url, headers={'Authorization': f'Bearer {self.token}'})
+
+    def _sync_get(self, url, params=None):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        return json.loads(client.get(url, params).content)
+
+    async def test_list_matches_sync_list(self):
+        for params in ({}, {'compact': 'true'}, {'fields': 'pk,attendees'}, {'ordering': '-end_date'},
+                       {'has_seats': 'true'}, {'q': 'event'}, {'attending': 'true'}):
+            response = await self.get('/async/events/', params)
+
+            self.assertEqual(response.status_code, 200, params)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            sync = await sync_to_async(self._sync_get)( '/events/', params)
+            self.assertEqual(json.loads(response.content)['results'], sync['results'], params)
+
+    async def test_list_pagination(self):
+        names = []
+        response = await self.get('/async/events/', {'page_size': 2, 'fields': 'name'})
+        while True:
+            data = json.loads(response.content)
+            names.extend(event['name'] for event in data['results'])
+            if not data['next']:
+                break
+            response = await self.get(data['next'])
+
+        self.assertEqual(names, ['Event 0', 'Event 1', 'Event 2'])
+
+    async def test_list_invalid_params(self):
+        response = await self.get('/async/events/', {'date': 'invalid'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date', json.loads(response.content))
+
+    async def test_detail_matches_sync_detail(self):
+        for params in ({}, {'fields': 'attendees'}):
+            response = await self.get(f'/async/events/{self.events[0].pk}/', params)
+
+            self.assertEqual(response.status_code, 200)
+            sync = await sync_to_async(self._sync_get)( f'/events/{self.events[0].pk}/', params)
+            self.assertEqual(json.loads(response.content), sync)
+
+    async def test_detail_not_found(self):
+        response = await self.get('/async/events/0/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {'detail': 'Not found.'})
+
+    async def test_register_and_unregister(self):
+        event = self.events[1]
+
+        response = await self.post(f'/async/events/{event.pk}/register/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {
+            'message': f'Registered user: {self.user.pk} for event: {event.pk}',
+            'event_id': event.pk,
+            'user_id': self.user.pk,
+            })
+        self.assertTrue(await event.attendees.filter(pk=self.user.pk).aexists())
+
+        response = await self.post(f'/async/events/{event.pk}/register/')
+        self.assertEqual(json.loads(response.content)['message'],
+                         f'User: {self.user.pk} is already registered for event: {event.pk}')
+
+        response = await self.post(f'/async/events/{event.pk}/unregister/')
+        self.assertEqual(json.loads(response.content)['message'],
+                         f'Unregistered user: {self.user.pk} for event: {event.pk}')
+        self.assertFalse(await event.attendees.filter(pk=self.user.pk).aexists())
+
+    async def test_register_full_event(self):
+        other = await User.objects.acreate(username='other')
+        await Event.objects.filter(pk=self.events[1].pk).aupdate(capacity=0)
+
+        response = await self.post(f'/async/events/{self.events[1].pk}/register/')
+
+        self.assertEqual(json.loads(response.content)['message'],
+                         'The attendance list for this event is full. You cannot register at this time.')
+        self.assertFalse(await self.events[1].attendees.filter(pk=other.pk).aexists())
+
+    async def test_register_unknown_event(self):
+        response = await self.post('/async/events/0/register/')
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_method_not_allowed(self):
+        response = await self.get(f'/async/events/{self.events[0].pk}/register/')
+
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(json.loads(response.content), {'detail': 'Method "GET" not allowed.'})
+
+    async def test_authentication_required(self):
+        response = await AsyncClient().get('/async/events/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+        response = await self.get('/async/events/', token='invalid')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content)['code'], 'token_not_valid')
+
+    async def test_inactive_user(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+
+        response = await self.get('/async/events/')
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content)['code'], 'user_inactive')
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_stateless_auth_runs_no_user_query(self):
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        # the event row only
+        with self.assertNumQueries(1):
+            response = client.get(f'/async/events/{self.events[0].pk}/')
+        self.assertEqual(response.status_code, 200)
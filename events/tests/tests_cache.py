@@ -0,0 +1,180 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import (
+    APIClient,
+    APITestCase,
+    )
+
+from events import cache
+from events.models import Event
+
+
+class ResponseCacheTest(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        cache.reset_cache_stats()
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.event = self._create('Test Event')
+        self.list_url = reverse('Events-list')
+        self.detail_url = f'/events/{self.event.pk}/'
+
+    def _rename(self, name):
+        self.client.put(self.detail_url, {
+            'name': name,
+            'start_date': self.event.start_date.isoformat(),
+            'end_date': self.event.end_date.isoformat(),
+            'capacity': self.event.capacity,
+            })
+
+    def _create(self, name):
+        return Event.objects.create(
+            name=name,
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2),
+            capacity=10,
+            created_by=self.user
+            )
+
+    def test_list_is_cached(self):
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache.cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_detail_is_cached(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['name'], 'Test Event')
+
+    def test_params_are_normalised(self):
+        self.client.get(self.list_url + f'?created_by={self.user.pk}&has_seats=true')
+        response = self.client.get(self.list_url + f'?has_seats=true&created_by={self.user.pk}')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_different_params_are_cached_separately(self):
+        self.client.get(self.list_url, {'has_seats': 'true'})
+        response = self.client.get(self.list_url, {'has_seats': 'false'})
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'], [])
+
+    def test_time_dependent_params_are_not_cached(self):
+        first = self.client.get(self.list_url, {'future': 'true'})
+        Event.objects.filter(pk=self.event.pk).update(start_date=timezone.now() - timedelta(minutes=1))
+
+        response = self.client.get(self.list_url, {'future': 'true'})
+
+        self.assertNotIn('X-Cache', response)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(cache.cache_stats(), {'hits': 0, 'misses': 0})
+
+    def test_user_dependent_params_are_cached_per_user(self):
+        self.event.attendees.add(self.user)
+        other_client = APIClient()
+        other_client.force_authenticate(user=User.objects.create(username='other'))
+
+        self.client.get(self.list_url, {'attending': 'true'})
+        response = other_client.get(self.list_url, {'attending': 'true'})
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'], [])
+
+    def test_not_found_is_not_cached(self):
+        self.client.get('/events/0/')
+        response = self.client.get('/events/0/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(cache.cache_stats()['hits'], 0)
+
+    def test_create_invalidates_lists(self):
+        self.client.get(self.list_url)
+        self._create('Second Event')
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_update_invalidates_detail_and_lists(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self._rename('Renamed')
+
+        self.assertEqual(self.client.get(self.detail_url).data['name'], 'Renamed')
+        self.assertEqual(self.client.get(self.list_url).data['results'][0]['name'], 'Renamed')
+
+    def test_update_only_invalidates_the_updated_detail(self):
+        other = self._create('Other Event')
+        self.client.get(f'/events/{other.pk}/')
+        self.client.get(self.detail_url)
+
+        self._rename('Renamed')
+
+        self.assertEqual(self.client.get(f'/events/{other.pk}/')['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(self.detail_url)['X-Cache'], 'MISS')
+
+    def test_register_and_unregister_invalidate(self):
+        self.client.get(self.detail_url)
+
+        self.client.post(f'{self.detail_url}register/')
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['attendee_count'], 1)
+
+        self.client.post(f'{self.detail_url}unregister/')
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['attendee_count'], 0)
+
+    def test_delete_invalidates(self):
+        self.client.get(self.list_url)
+        self.client.delete(self.detail_url)
+
+        self.assertEqual(self.client.get(self.list_url).data['results'], [])
+
+    @override_settings(EVENTS_RESPONSE_CACHE=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url)
+
+        self.assertNotIn('X-Cache', response)
+
+    @override_settings(
+        CACHES={'bounded': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bounded',
+                            'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4}}},
+        EVENTS_CACHE_ALIAS='bounded',
+        )
+    def test_least_recently_used_entries_are_evicted(self):
+        # the list version key takes one slot, the rest hold responses
+        self.client.get(self.list_url, {'page_size': 1})
+        self.client.get(self.list_url, {'page_size': 2})
+        self.client.get(self.list_url, {'page_size': 3})
+        self.client.get(self.list_url, {'page_size': 1})
+        self.client.get(self.list_url, {'page_size': 4})
+
+        self.assertEqual(self.client.get(self.list_url, {'page_size': 1})['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(self.list_url, {'page_size': 2})['X-Cache'], 'MISS')
+
+    def test_cache_stats_endpoint(self):
+        self.client.get(self.list_url)
+        self.assertEqual(self.client.get(reverse('Events-cache-stats')).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('Events-cache-stats'))
+
+        self.assertEqual(response.data, {'hits': 0, 'misses': 1})
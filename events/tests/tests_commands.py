@@ -0,0 +1,263 @@
+from datetime import timedelta
+from io import StringIO
+import json
+import os
+import tempfile
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import (
+    CommandError,
+    call_command,
+    )
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event
+from events.registration import Attendance
+
+
+class ReconcileAttendeeCountCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.event = Event.objects.create(
+            name='Test Event',
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2),
+            capacity=10,
+            created_by=self.user
+            )
+        self.event.attendees.add(self.user)
+
+    def test_fixes_drift(self):
+        Event.objects.filter(pk=self.event.pk).update(attendee_count=7)
+        out = StringIO()
+
+        call_command('reconcile_attendee_count', stdout=out)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertIn('fixed 1 attendee count(s)', out.getvalue())
+
+    def test_no_drift(self):
+        out = StringIO()
+
+        call_command('reconcile_attendee_count', str(self.event.pk), stdout=out)
+
+        self.assertIn('Checked 1 event(s), fixed 0 attendee count(s).', out.getvalue())
+
+
+class ImportEventsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='creator')
+        self.attendees = [User.objects.create(username=f'attendee{i}') for i in range(3)]
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.start = timezone.now() + timedelta(days=1)
+
+    def _row(self, i, **overrides):
+        return {
+            'name': f'Event {i}',
+            'description': f'Description {i}',
+            'start_date': (self.start + timedelta(hours=i)).isoformat(),
+            'end_date': (self.start + timedelta(hours=i + 1)).isoformat(),
+            'capacity': 10,
+            'created_by': 'creator',
+            **overrides,
+            }
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            file.write(content)
+        return path
+
+    def _ndjson(self, rows):
+        return self._write('events.ndjson', ''.join(json.dumps(row) + '\n' for row in rows))
+
+    def _call(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_events', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_ndjson(self):
+        attendee_ids = [a.pk for a in self.attendees]
+        path = self._ndjson([self._row(i, attendees=attendee_ids if i == 0 else []) for i in range(5)])
+
+        out, err = self._call(path, '--batch-size', '2')
+
+        self.assertIn('Imported 5 event(s), rejected 0 row(s).', out)
+        self.assertIn('rows/s', out)
+        self.assertEqual(err, '')
+        event = Event.objects.get(name='Event 0')
+        self.assertEqual(event.created_by, self.user)
+        self.assertEqual(event.attendee_count, 3)
+        self.assertEqual(sorted(event.attendees.values_list('pk', flat=True)), attendee_ids)
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_import_csv(self):
+        attendees = ';'.join(str(a.pk) for a in self.attendees[:2])
+        content = 'name,description,start_date,end_date,capacity,created_by,attendees\n'
+        content += f'"Party, with comma",,{self.start.isoformat()},{self.start.isoformat()},5,{self.user.pk},'
+        content += f'{attendees}\n'
+        path = self._write('events.csv', content)
+
+        out, _ = self._call(path)
+
+        event = Event.objects.get()
+        self.assertEqual(event.name, 'Party, with comma')
+        self.assertIsNone(event.description)
+        self.assertEqual(event.attendees.count(), 2)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [
+            self._row(0),
+            self._row(1, end_date=(self.start - timedelta(days=2)).isoformat()),
+            self._row(2, created_by='nobody'),
+            self._row(3, capacity=1, attendees=[a.pk for a in self.attendees]),
+            self._row(4, start_date='tomorrow'),
+            ]
+        path = self._write('events.ndjson', json.dumps(rows[0]) + '\nnot json\n' + ''.join(
+            json.dumps(row) + '\n' for row in rows[1:]))
+
+        out, err = self._call(path)
+
+        self.assertIn('Imported 1 event(s), rejected 5 row(s).', out)
+        self.assertIn('Row 2: Invalid JSON', err)
+        self.assertIn("Row 3: Event can't end in the past.", err)
+        self.assertIn("Row 4: created_by: unknown user 'nobody'.", err)
+        self.assertIn('Row 5: attendees: more attendees than capacity.', err)
+        self.assertIn('Row 6: start_date', err)
+
+    def test_malformed_attendees_and_description_are_rejected(self):
+        path = self._ndjson([
+            self._row(0, attendees=5),
+            self._row(1, attendees='1 2'),
+            self._row(2, description={'text': 'nested'}),
+            self._row(3),
+            ])
+
+        out, err = self._call(path)
+
+        self.assertIn('Imported 1 event(s), rejected 3 row(s).', out)
+        self.assertIn('Row 1: attendees: expected a list of user ids.', err)
+        self.assertIn('Row 2: attendees: expected a list of user ids.', err)
+        self.assertIn('Row 3: description: expected a string or null.', err)
+        self.assertEqual(Event.objects.get().name, 'Event 3')
+
+    def test_impossible_dates_and_out_of_range_ids_are_rejected(self):
+        huge = 2 ** 64
+        path = self._ndjson([
+            self._row(0, start_date='2026-13-45T00:00:00'),
+            self._row(1, capacity=huge),
+            self._row(2, created_by=huge),
+            self._row(3, attendees=[self.attendees[0].pk, huge]),
+            self._row(4, capacity=-1),
+            self._row(5),
+            ])
+
+        out, err = self._call(path)
+
+        self.assertIn('Imported 1 event(s), rejected 5 row(s).', out)
+        self.assertIn('Row 1: start_date: enter a valid date/time in ISO 8601 format.', err)
+        self.assertIn('Row 2: capacity: ensure this value is between', err)
+        self.assertIn(f"Row 3: created_by: unknown user {huge!r}.", err)
+        self.assertIn('Row 4: attendees: ensure this value is between', err)
+        self.assertIn('Row 5: capacity: ensure this value is greater than or equal to 0.', err)
+        self.assertEqual(Event.objects.get().name, 'Event 5')
+
+    def test_allow_past(self):
+        past = timezone.now() - timedelta(days=10)
+        path = self._ndjson([self._row(0, start_date=past.isoformat(), end_date=past.isoformat())])
+
+        self._call(path)
+        self.assertEqual(Event.objects.count(), 0)
+
+        self._call(path, '--allow-past')
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_resume_after_failure(self):
+        path = self._ndjson([self._row(i) for i in range(5)])
+        bulk_create = Attendance.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Attendance.objects, 'bulk_create', side_effect=failing_bulk_create):
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True):
+                self._call(path, '--batch-size', '2')
+
+        self.assertEqual(Event.objects.count(), 2)
+        with open(f'{path}.checkpoint') as file:
+            self.assertEqual(file.read(), '2')
+
+        out, _ = self._call(path, '--batch-size', '2', '--resume')
+
+        self.assertIn('Resuming after row 2.', out)
+        self.assertEqual(list(Event.objects.order_by('pk').values_list('name', flat=True)),
+                         [f'Event {i}' for i in range(5)])
+
+    def test_checkpoint_waits_for_the_commit(self):
+        path = self._ndjson([self._row(i) for i in range(3)])
+        bulk_create = Attendance.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return bulk_create(*args, **kwargs)
+
+        # the test transaction never commits, so neither does the first batch
+        with mock.patch.object(Attendance.objects, 'bulk_create', side_effect=failing_bulk_create):
+            with self.assertRaises(RuntimeError):
+                self._call(path, '--batch-size', '2')
+
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            self._call(os.path.join(self.directory.name, 'missing.ndjson'))
+
+
+class BenchmarkSerializersCommandTest(TestCase):
+    def test_benchmark(self):
+        out = StringIO()
+
+        call_command('benchmark_serializers', '--rows', '20', '--repeat', '1', stdout=out)
+
+        self.assertIn('20 events, best of 1', out.getvalue())
+        self.assertIn('identical output', out.getvalue())
+        self.assertFalse(Event.objects.exists())
+
+    def test_invalid_options(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_serializers', '--rows', '0')
+
+
+class BenchmarkAuthCommandTest(TestCase):
+    def test_benchmark(self):
+        out = StringIO()
+
+        call_command('benchmark_auth', '--requests', '2', stdout=out)
+
+        self.assertIn('MD5PasswordHasher, 2 requests each', out.getvalue())
+        self.assertIn('login', out.getvalue())
+        self.assertIn('register', out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+    def test_hasher_option(self):
+        out = StringIO()
+
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            call_command('benchmark_auth', '--requests', '1', '--hasher', 'auth.hashers.PBKDF2PasswordHasher',
+                         stdout=out)
+
+        self.assertIn('auth.hashers.PBKDF2PasswordHasher (1000 iterations)', out.getvalue())
+
+    def test_invalid_options(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_auth', '--requests', '0')
@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import (
+    APIClient,
+    APITestCase,
+    )
+
+from events import cache
+from events.models import Event
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.event = self._create('Test Event')
+        self.list_url = reverse('Events-list')
+        self.detail_url = f'/events/{self.event.pk}/'
+
+    def _create(self, name):
+        return Event.objects.create(
+            name=name,
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2),
+            capacity=10,
+            created_by=self.user
+            )
+
+    def test_detail_validators(self):
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertEqual(response['Last-Modified'], http_date(int(self.event.updated.timestamp())))
+
+    def test_detail_not_modified(self):
+        etag = self.client.get(self.detail_url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_changes_after_register(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.client.post(f'{self.detail_url}register/')
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_changes_after_recount(self):
+        Event.objects.filter(pk=self.event.pk).update(attendee_count=3, updated=timezone.now() - timedelta(days=1))
+        etag = self.client.get(self.detail_url)['ETag']
+
+        call_command('reconcile_attendee_count', stdout=StringIO())
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['attendee_count'], 0)
+
+    def test_detail_changes_after_attendee_swap(self):
+        self.event.attendees.add(User.objects.create(username='first'))
+        etag = self.client.get(self.detail_url)['ETag']
+
+        self.event.attendees.set([User.objects.create(username='second')])
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_changes_after_attendees_edit(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.event.attendees.add(User.objects.create(username='attendee'))
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified(self):
+        etag = self.client.get(self.list_url)['ETag']
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_changes_after_create_and_delete(self):
+        etag = self.client.get(self.list_url)['ETag']
+        other = self._create('Other Event')
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_etag_depends_on_params(self):
+        future = self.client.get(self.list_url, {'future': 'true'})['ETag']
+        past = self.client.get(self.list_url, {'past': 'true'})['ETag']
+
+        self.assertNotEqual(future, past)
+        self.assertEqual(self.client.get(self.list_url, {'past': 'true'}, HTTP_IF_NONE_MATCH=future).status_code, 200)
+
+    @override_settings(EVENTS_RESPONSE_CACHE=False)
+    def test_not_modified_without_cache_skips_serialization(self):
+        etag = self.client.get(self.list_url)['ETag']
+
+        # only the aggregate query runs
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_found(self):
+        response = self.client.get('/events/0/', HTTP_IF_NONE_MATCH='"abc"')
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,97 @@
+import csv
+from datetime import timedelta
+import io
+import json
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.test import (
+    APIClient,
+    APITestCase,
+    )
+
+from events import export
+from events.models import Event
+
+
+class ExportViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.events = [
+            Event.objects.create(
+                name=f'Event {i}',
+                description='Commas, "quotes"\nand newlines' if i == 0 else None,
+                start_date=self.start + timedelta(hours=i),
+                end_date=self.start + timedelta(hours=i + 1),
+                capacity=10,
+                created_by=self.user
+                )
+            for i in range(5)
+            ]
+
+    def _content(self, response):
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        response = self.client.get('/events/export/')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="events.ndjson"')
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([row['name'] for row in rows], [f'Event {i}' for i in range(5)])
+        self.assertEqual(rows[0]['created_by'], 'testuser')
+        self.assertEqual(rows[0]['description'], 'Commas, "quotes"\nand newlines')
+        self.assertEqual(rows[0]['start_date'], self.start.isoformat().replace('+00:00', 'Z'))
+
+    def test_export_csv(self):
+        response = self.client.get('/events/export/', {'output': 'csv'})
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['description'], 'Commas, "quotes"\nand newlines')
+        self.assertEqual(rows[4]['attendee_count'], '0')
+
+    def test_export_applies_filters(self):
+        start_after = (self.start + timedelta(hours=3)).isoformat()
+
+        response = self.client.get('/events/export/', {'start_after': start_after})
+
+        self.assertEqual(len(self._content(response).splitlines()), 2)
+
+    def test_export_reads_in_chunks(self):
+        chunk_size = export.CHUNK_SIZE
+        export.CHUNK_SIZE = 2
+        try:
+            response = self.client.get('/events/export/')
+            self.assertEqual(len(self._content(response).splitlines()), 5)
+        finally:
+            export.CHUNK_SIZE = chunk_size
+
+    def test_invalid_output(self):
+        response = self.client.get('/events/export/', {'output': 'xml'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('output', response.data)
+
+    def test_export_attendees(self):
+        attendees = [User.objects.create(username=f'attendee{i}') for i in range(3)]
+        self.events[0].attendees.add(*attendees)
+
+        response = self.client.get(f'/events/{self.events[0].pk}/export-attendees/', {'output': 'csv'})
+
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0], ['user_id', 'username'])
+        self.assertEqual(rows[1:], [[str(a.pk), a.username] for a in attendees])
+
+    def test_export_attendees_permission_denied(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create(username='other'))
+
+        response = client.get(f'/events/{self.events[0].pk}/export-attendees/')
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,128 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    )
+
+from events.views import EventViewSet
+
+
+class EventQueryPlanTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create(username='testuser')
+
+    # query plan of the page query the list endpoint runs for the given filters
+    def _plan(self, params):
+        request = Request(self.factory.get('/events/', params))
+        request.user = self.user
+        view = EventViewSet(action='list', request=request, format_kwarg=None)
+        queryset = view.filter_queryset(view.get_queryset())
+        return queryset.order_by(*view.paginator.get_ordering(view.request, queryset, view)).explain()
+
+    def assertUsesIndex(self, plan, index_name):
+        self.assertIn(f'events_event USING INDEX {index_name}', plan)
+        self.assertNotIn('USE TEMP B-TREE', plan)
+
+    def test_date_filter_is_a_range_search(self):
+        plan = self._plan({'date': '2023-03-05'})
+
+        self.assertUsesIndex(plan, 'event_start_date_id_idx (start_date>? AND start_date<?)')
+
+    def test_past_filter(self):
+        plan = self._plan({'past': 'true'})
+
+        self.assertUsesIndex(plan, 'event_start_date_id_idx (start_date<?)')
+
+    def test_future_filter(self):
+        plan = self._plan({'future': 'true'})
+
+        self.assertUsesIndex(plan, 'event_start_date_id_idx (start_date>?)')
+
+    def test_has_seats_filter_uses_partial_index(self):
+        plan = self._plan({'has_seats': 'true'})
+
+        self.assertUsesIndex(plan, 'event_has_seats_start_idx')
+
+    def test_has_seats_and_future_filters(self):
+        plan = self._plan({'has_seats': 'true', 'future': 'true'})
+
+        self.assertUsesIndex(plan, 'event_has_seats_start_idx (start_date>?)')
+
+    def test_unfiltered_list_walks_the_pagination_index(self):
+        plan = self._plan({})
+
+        self.assertUsesIndex(plan, 'event_start_date_id_idx')
+
+    def test_created_by_filter(self):
+        plan = self._plan({'created_by': self.user.pk, 'start_after': '2023-03-05'})
+
+        self.assertUsesIndex(plan, 'event_creator_start_idx (created_by_id=? AND start_date>?)')
+
+    def test_end_date_range_ordered_by_end_date(self):
+        plan = self._plan({'end_after': '2023-03-05', 'end_before': '2023-04-05', 'ordering': '-end_date'})
+
+        self.assertUsesIndex(plan, 'event_end_date_id_idx (end_date>? AND end_date<?)')
+
+    # not index-backed: checked row by row while walking the pagination index
+    def test_capacity_filters_scan_the_pagination_index(self):
+        plan = self._plan({'min_capacity': 5, 'max_capacity': 10})
+
+        self.assertIn('SCAN events_event USING INDEX event_start_date_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    # in start_date order the end_date index can't serve the page: the rows are either scanned in start_date order
+    # or range searched on end_date and then sorted
+    def test_end_date_range_in_default_ordering_is_not_index_backed(self):
+        plan = self._plan({'end_after': '2023-03-05'})
+        self.assertIn('SCAN events_event USING INDEX event_start_date_id_idx', plan)
+
+        plan = self._plan({'end_after': '2023-03-05', 'end_before': '2023-04-05'})
+        self.assertIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_start_date_range(self):
+        plan = self._plan({'start_after': '2023-03-05T10:00:00Z', 'start_before': '2023-04-05'})
+
+        self.assertUsesIndex(plan, 'event_start_date_id_idx (start_date>? AND start_date<?)')
+
+    def test_attending_filter(self):
+        plan = self._plan({'attending': 'true'})
+
+        # driven by the through table's user_id index, only the user's own events are sorted
+        self.assertIn('SEARCH events_event_attendees USING INDEX events_event_attendees_user_id', plan)
+        self.assertIn('SEARCH events_event USING INTEGER PRIMARY KEY', plan)
+        self.assertNotIn('SCAN', plan)
+
+
+class MineQueryPlanTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    # query plan of the page query the endpoint actually ran
+    def _plan(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {'fields': 'pk,name'})
+        self.assertEqual(len(context.captured_queries), 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {context.captured_queries[0]["sql"]}')
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def test_mine_created_walks_the_creator_index(self):
+        plan = self._plan('/events/mine/created/')
+
+        self.assertIn('SEARCH events_event USING INDEX event_creator_start_idx (created_by_id=?)', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_mine_attending_starts_from_the_user_attendance_rows(self):
+        plan = self._plan('/events/mine/attending/')
+
+        self.assertIn('SEARCH events_event_attendees USING INDEX events_event_attendees_user_id', plan)
+        self.assertIn('SEARCH events_event USING INTEGER PRIMARY KEY', plan)
+        self.assertNotIn('SCAN', plan)
@@ -35,6 +35,32 @@ class EventModelTest(TestCase):
         attendees = self.event.get_attendees()
         self.assertEqual(attendees, "attendee1\nattendee2")
 
+    def test_attendee_count_follows_m2m_changes(self):
+        attendee1 = User.objects.create(username='attendee1')
+        attendee2 = User.objects.create(username='attendee2')
+
+        self.event.attendees.add(attendee1, attendee2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 2)
+        self.assertEqual(self.event.seats_remaining, 98)
+
+        self.event.attendees.remove(attendee1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+        attendee2.attendees.clear()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 0)
+
+        attendee1.attendees.add(self.event)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_seats_remaining_never_negative(self):
+        self.event.attendee_count = 150
+
+        self.assertEqual(self.event.seats_remaining, 0)
+
     def test_save_valid_event(self):
         event = Event(
             name='Valid Event',
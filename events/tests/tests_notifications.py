@@ -0,0 +1,197 @@
+import asyncio
+from datetime import timedelta
+import json
+import threading
+from unittest import mock
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import User
+from django.test import (
+    AsyncClient,
+    TestCase,
+    override_settings,
+    )
+from django.utils import timezone
+
+from auth.serializers import MyTokenObtainPairSerializer
+from events import (
+    async_views,
+    notifications,
+    registration,
+    )
+from events.models import Event
+from manager.asgi import application
+
+
+class NotificationBackendTest(TestCase):
+    def setUp(self):
+        self.backend = notifications.LocalNotificationBackend()
+
+    async def _received(self, subscription):
+        return await asyncio.wait_for(subscription.get(), 1)
+
+    async def test_fan_out_with_filters(self):
+        everything = notifications.Subscription()
+        some_events = notifications.Subscription(event_ids=[1, 3])
+        registrations = notifications.Subscription(types=[notifications.REGISTERED])
+        for subscription in (everything, some_events, registrations):
+            self.backend.subscribe(subscription)
+
+        self.backend.publish({'type': notifications.UPDATED, 'event_ids': [1, 2]})
+        self.backend.publish({'type': notifications.REGISTERED, 'event_ids': [2], 'user_ids': [7]})
+
+        self.assertEqual(await self._received(everything), {'type': 'updated', 'event_ids': [1, 2]})
+        self.assertEqual((await self._received(everything))['type'], 'registered')
+        self.assertEqual(await self._received(some_events), {'type': 'updated', 'event_ids': [1]})
+        self.assertTrue(some_events.queue.empty())
+        self.assertEqual(await self._received(registrations), {'type': 'registered', 'event_ids': [2], 'user_ids': [7]})
+        self.assertTrue(registrations.queue.empty())
+
+    async def test_publish_from_another_thread(self):
+        subscription = notifications.Subscription()
+        self.backend.subscribe(subscription)
+
+        thread = threading.Thread(target=self.backend.publish, args=({'type': 'created', 'event_ids': [5]},))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(await self._received(subscription), {'type': 'created', 'event_ids': [5]})
+
+    async def test_slow_subscriber_is_reset(self):
+        subscription = notifications.Subscription(max_pending=2)
+        self.backend.subscribe(subscription)
+
+        for event_id in range(3):
+            self.backend.publish({'type': 'updated', 'event_ids': [event_id]})
+
+        self.assertEqual(await self._received(subscription), {'type': 'reset', 'event_ids': []})
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_unsubscribe(self):
+        subscription = notifications.Subscription()
+        self.backend.subscribe(subscription)
+        self.backend.unsubscribe(subscription)
+
+        self.backend.publish({'type': 'updated', 'event_ids': [1]})
+        await asyncio.sleep(0)
+
+        self.assertTrue(subscription.queue.empty())
+
+
+class NotifyTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.published = []
+        patcher = mock.patch.object(notifications, '_backend', mock.Mock(publish=self.published.append))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        start = timezone.now() + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event = Event.objects.create(name='Test Event', start_date=start, end_date=start + timedelta(hours=1),
+                                              capacity=10, created_by=self.user)
+
+    def test_published_after_commit(self):
+        self.assertEqual(self.published, [{'type': 'created', 'event_ids': [self.event.pk]}])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.event.save()
+        self.assertEqual(len(self.published), 1)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.published[-1], {'type': 'updated', 'event_ids': [self.event.pk]})
+
+    def test_registration(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registration.register_attendee(self.event.pk, self.user.pk)
+            registration.register_attendee(self.event.pk, self.user.pk)
+            registration.unregister_attendee(self.event.pk, self.user.pk)
+
+        self.assertEqual(self.published[1:], [
+            {'type': 'registered', 'event_ids': [self.event.pk], 'user_ids': [self.user.pk]},
+            {'type': 'unregistered', 'event_ids': [self.event.pk], 'user_ids': [self.user.pk]},
+            ])
+
+    def test_attendees_edited_directly(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.attendees.add(self.user)
+            self.user.attendees.clear()
+
+        types = [message['type'] for message in self.published[1:]]
+        self.assertIn('registered', types)
+        self.assertEqual(types[-1], 'updated')
+
+    def test_delete(self):
+        pk = self.event.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+
+        self.assertEqual(self.published[-1], {'type': 'deleted', 'event_ids': [pk]})
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class EventStreamViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.token = str(MyTokenObtainPairSerializer.get_token(self.user).access_token)
+        self.backend = notifications.LocalNotificationBackend()
+        patcher = mock.patch.object(notifications, '_backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, params=None):
+        return AsyncClient().get('/async/events/stream/', params, headers={'Authorization': f'Bearer {self.token}'})
+
+    async def test_stream(self):
+        response = await self.get({'events': '1,2', 'types': 'registered'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 1000\n\n')
+
+        self.backend.publish({'type': 'created', 'event_ids': [1]})
+        self.backend.publish({'type': 'registered', 'event_ids': [2, 3], 'user_ids': [9]})
+
+        chunk = await asyncio.wait_for(anext(chunks), 1)
+        self.assertEqual(chunk, b'event: registered\ndata: {"type":"registered","event_ids":[2],"user_ids":[9]}\n\n')
+        # as the ASGI handler does when the response is over
+        await sync_to_async(response.close)()
+        self.assertFalse(self.backend._subscriptions)
+
+    async def test_keep_alive_and_end_of_stream(self):
+        with mock.patch.object(async_views, 'STREAM_KEEPALIVE', 0.01), \
+                mock.patch.object(async_views, 'STREAM_DURATION', 0.05):
+            response = await self.get()
+            chunks = [chunk async for chunk in response.streaming_content]
+
+        self.assertEqual(chunks[0], b'retry: 1000\n\n')
+        self.assertIn(b': keep-alive\n\n', chunks)
+        self.assertFalse(self.backend._subscriptions)
+
+    async def test_invalid_filters(self):
+        response = await self.get({'types': 'created,moved'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('types', json.loads(response.content))
+
+        response = await self.get({'events': 'one'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_through_asgi_application(self):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': '/async/events/stream/', 'raw_path': b'/async/events/stream/', 'query_string': b'',
+            'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {self.token}'.encode())],
+            }
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({'type': 'http.request', 'body': b'', 'more_body': False})
+
+        start = await communicator.receive_output(1)
+        self.assertEqual(start['status'], 200)
+        self.assertEqual((await communicator.receive_output(1))['body'], b'retry: 1000\n\n')
+
+        await sync_to_async(self.backend.publish)({'type': 'updated', 'event_ids': [4]})
+        body = (await communicator.receive_output(1))['body']
+        self.assertEqual(body, b'event: updated\ndata: {"type":"updated","event_ids":[4]}\n\n')
+
+        await communicator.send_input({'type': 'http.disconnect'})
+        communicator.future.cancel()
@@ -0,0 +1,395 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import threading
+import time
+from django.contrib.auth.models import User
+from django.db import (
+    OperationalError,
+    connection,
+    )
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    )
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from events import registration
+from events.models import (
+    Event,
+    WaitlistEntry,
+    )
+
+
+class RegistrationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.event = Event.objects.create(
+            name='Test Event',
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2),
+            capacity=1,
+            created_by=self.user
+            )
+
+    def test_register_increments_attendee_count(self):
+        result = registration.register_attendee(self.event.pk, self.user.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(result, registration.REGISTERED)
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertIn(self.user, self.event.attendees.all())
+
+    def test_register_twice_does_not_take_a_second_seat(self):
+        self.event.capacity = 2
+        self.event.save()
+
+        registration.register_attendee(self.event.pk, self.user.pk)
+        result = registration.register_attendee(self.event.pk, self.user.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(result, registration.ALREADY_REGISTERED)
+        self.assertEqual(self.event.attendee_count, 1)
+
+    def test_register_full_event(self):
+        other = User.objects.create(username='other')
+        registration.register_attendee(self.event.pk, other.pk)
+
+        result = registration.register_attendee(self.event.pk, self.user.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(result, registration.FULL)
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertNotIn(self.user, self.event.attendees.all())
+
+    def test_register_started_event(self):
+        self.event.start_date = timezone.now() - timedelta(minutes=1)
+        self.event.save()
+
+        result = registration.register_attendee(self.event.pk, self.user.pk)
+
+        self.assertEqual(result, registration.STARTED)
+
+    def test_register_over_capacity_event_is_still_full(self):
+        # rows that drifted past capacity must keep blocking registrations
+        self.event.attendee_count = 5
+        self.event.save()
+
+        result = registration.register_attendee(self.event.pk, self.user.pk)
+
+        self.assertEqual(result, registration.FULL)
+
+    def test_unregister_releases_seat(self):
+        registration.register_attendee(self.event.pk, self.user.pk)
+
+        result = registration.unregister_attendee(self.event.pk, self.user.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(result, registration.UNREGISTERED)
+        self.assertEqual(self.event.attendee_count, 0)
+        self.assertNotIn(self.user, self.event.attendees.all())
+
+    def test_unregister_not_registered_user(self):
+        result = registration.unregister_attendee(self.event.pk, self.user.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(result, registration.NOT_REGISTERED)
+        self.assertEqual(self.event.attendee_count, 0)
+
+    def test_register_round_trips(self):
+        with CaptureQueriesContext(connection) as context:
+            registration.register_attendee(self.event.pk, self.user.pk)
+
+        statements = [q['sql'] for q in context.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 2)
+
+
+class BulkRegistrationTest(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create(username='creator')
+        self.users = [User.objects.create(username=f'user{i}') for i in range(5)]
+        self.event = self._create(capacity=3)
+
+    def _create(self, capacity, start_date=None):
+        start_date = start_date or timezone.now() + timedelta(days=1)
+        return Event.objects.create(
+            name='Test Event',
+            start_date=start_date,
+            end_date=start_date + timedelta(days=1),
+            capacity=capacity,
+            created_by=self.creator
+            )
+
+    def _statements(self, function, *args):
+        with CaptureQueriesContext(connection) as context:
+            result = function(*args)
+        return result, [q['sql'] for q in context.captured_queries if 'SAVEPOINT' not in q['sql']]
+
+    def test_register_attendees(self):
+        registration.register_attendee(self.event.pk, self.users[0].pk)
+
+        results = registration.register_attendees(self.event.pk, [self.users[0].pk, self.users[1].pk, 0,
+                                                                  self.users[2].pk, self.users[1].pk])
+
+        self.event.refresh_from_db()
+        self.assertEqual(results, {
+            self.users[0].pk: registration.ALREADY_REGISTERED,
+            self.users[1].pk: registration.REGISTERED,
+            0: registration.UNKNOWN_USER,
+            self.users[2].pk: registration.REGISTERED,
+            })
+        self.assertEqual(self.event.attendee_count, 3)
+        self.assertEqual(self.event.attendees.count(), 3)
+
+    def test_register_attendees_batch_over_capacity(self):
+        results = registration.register_attendees(self.event.pk, [user.pk for user in self.users])
+
+        self.event.refresh_from_db()
+        self.assertEqual(set(results.values()), {registration.FULL})
+        self.assertEqual(self.event.attendee_count, 0)
+        self.assertEqual(self.event.attendees.count(), 0)
+
+    def test_register_attendees_started_event(self):
+        event = self._create(capacity=3, start_date=timezone.now() - timedelta(hours=1))
+
+        results = registration.register_attendees(event.pk, [self.users[0].pk])
+
+        self.assertEqual(results, {self.users[0].pk: registration.STARTED})
+
+    def test_register_attendees_query_count_is_constant(self):
+        event = self._create(capacity=100)
+
+        _, statements = self._statements(registration.register_attendees, event.pk, [self.users[0].pk])
+        _, more_statements = self._statements(registration.register_attendees, event.pk,
+                                              [user.pk for user in self.users[1:]])
+
+        self.assertEqual(len(statements), 4)
+        self.assertEqual(len(more_statements), 4)
+
+    def test_unregister_attendees(self):
+        registration.register_attendees(self.event.pk, [self.users[0].pk, self.users[1].pk])
+
+        results, statements = self._statements(registration.unregister_attendees, self.event.pk,
+                                               [self.users[0].pk, self.users[1].pk, self.users[2].pk])
+
+        self.event.refresh_from_db()
+        self.assertEqual(results, {
+            self.users[0].pk: registration.UNREGISTERED,
+            self.users[1].pk: registration.UNREGISTERED,
+            self.users[2].pk: registration.NOT_REGISTERED,
+            })
+        self.assertEqual(self.event.attendee_count, 0)
+        # select + delete + counter update, and the (empty) head of the waitlist
+        self.assertEqual(len(statements), 4)
+
+    def test_register_events(self):
+        full = self._create(capacity=0)
+        started = self._create(capacity=10, start_date=timezone.now() - timedelta(hours=1))
+        registered = self._create(capacity=10)
+        registration.register_attendee(registered.pk, self.users[0].pk)
+
+        results = registration.register_events(self.users[0].pk, [self.event.pk, full.pk, started.pk,
+                                                                   registered.pk, 0])
+
+        self.event.refresh_from_db()
+        self.assertEqual(results, {
+            self.event.pk: registration.REGISTERED,
+            full.pk: registration.FULL,
+            started.pk: registration.STARTED,
+            registered.pk: registration.ALREADY_REGISTERED,
+            0: registration.UNKNOWN_EVENT,
+            })
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertIn(self.users[0], self.event.attendees.all())
+
+    def test_unregister_events(self):
+        other = self._create(capacity=10)
+        registration.register_events(self.users[0].pk, [self.event.pk, other.pk])
+
+        results = registration.unregister_events(self.users[0].pk, [self.event.pk, other.pk, 0])
+
+        other.refresh_from_db()
+        self.assertEqual(results, {
+            self.event.pk: registration.UNREGISTERED,
+            other.pk: registration.UNREGISTERED,
+            0: registration.NOT_REGISTERED,
+            })
+        self.assertEqual(other.attendee_count, 0)
+
+
+class WaitlistTest(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create(username='creator')
+        self.users = [User.objects.create(username=f'user{i}') for i in range(4)]
+        self.event = Event.objects.create(
+            name='Test Event',
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2),
+            capacity=1,
+            created_by=self.creator
+            )
+        registration.register_attendee(self.event.pk, self.users[0].pk)
+
+    def _attendees(self):
+        return set(self.event.attendees.values_list('pk', flat=True))
+
+    def test_join_full_event_queues_in_order(self):
+        results = [registration.join_waitlist(self.event.pk, user.pk) for user in self.users[1:]]
+
+        self.assertEqual(results, [registration.WAITLISTED] * 3)
+        self.assertEqual([registration.waitlist_position(self.event.pk, user.pk) for user in self.users[1:]],
+                         [1, 2, 3])
+        self.assertIsNone(registration.waitlist_position(self.event.pk, self.users[0].pk))
+
+    def test_join_with_free_seat_registers(self):
+        registration.unregister_attendee(self.event.pk, self.users[0].pk)
+
+        result = registration.join_waitlist(self.event.pk, self.users[1].pk)
+
+        self.assertEqual(result, registration.REGISTERED)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_join_started_full_event(self):
+        Event.objects.filter(pk=self.event.pk).update(start_date=timezone.now() - timedelta(minutes=1))
+
+        result = registration.join_waitlist(self.event.pk, self.users[1].pk)
+
+        self.assertEqual(result, registration.STARTED)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_join_twice_or_when_registered(self):
+        registration.join_waitlist(self.event.pk, self.users[1].pk)
+
+        self.assertEqual(registration.join_waitlist(self.event.pk, self.users[1].pk),
+                         registration.ALREADY_WAITLISTED)
+        self.assertEqual(registration.join_waitlist(self.event.pk, self.users[0].pk),
+                         registration.ALREADY_REGISTERED)
+        self.assertEqual(WaitlistEntry.objects.count(), 1)
+
+    def test_unregister_promotes_head(self):
+        for user in self.users[1:]:
+            registration.join_waitlist(self.event.pk, user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            registration.unregister_attendee(self.event.pk, self.users[0].pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self._attendees(), {self.users[1].pk})
+        self.assertEqual(self.event.attendee_count, 1)
+        self.assertEqual([registration.waitlist_position(self.event.pk, user.pk) for user in self.users[2:]],
+                         [1, 2])
+
+    def test_leave_waitlist(self):
+        registration.join_waitlist(self.event.pk, self.users[1].pk)
+        registration.join_waitlist(self.event.pk, self.users[2].pk)
+
+        self.assertEqual(registration.leave_waitlist(self.event.pk, self.users[1].pk), registration.LEFT_WAITLIST)
+        self.assertEqual(registration.leave_waitlist(self.event.pk, self.users[1].pk), registration.NOT_WAITLISTED)
+
+        registration.unregister_attendee(self.event.pk, self.users[0].pk)
+        self.assertEqual(self._attendees(), {self.users[2].pk})
+
+    def test_promotion_skips_users_registered_meanwhile(self):
+        registration.join_waitlist(self.event.pk, self.users[1].pk)
+        registration.join_waitlist(self.event.pk, self.users[2].pk)
+        # e.g. added by the creator while waiting
+        Event.objects.filter(pk=self.event.pk).update(capacity=2)
+        registration.register_attendee(self.event.pk, self.users[1].pk)
+
+        registration.unregister_attendee(self.event.pk, self.users[0].pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self._attendees(), {self.users[1].pk, self.users[2].pk})
+        self.assertEqual(self.event.attendee_count, 2)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_no_promotion_after_start(self):
+        registration.join_waitlist(self.event.pk, self.users[1].pk)
+        Event.objects.filter(pk=self.event.pk).update(start_date=timezone.now() - timedelta(minutes=1))
+
+        registration.unregister_attendee(self.event.pk, self.users[0].pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self._attendees(), set())
+        self.assertEqual(self.event.attendee_count, 0)
+        self.assertEqual(registration.waitlist_position(self.event.pk, self.users[1].pk), 1)
+
+    def test_promote_waitlist_fills_raised_capacity(self):
+        for user in self.users[1:]:
+            registration.join_waitlist(self.event.pk, user.pk)
+        Event.objects.filter(pk=self.event.pk).update(capacity=3)
+
+        promoted = registration.promote_waitlist(self.event.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(promoted, [self.users[1].pk, self.users[2].pk])
+        self.assertEqual(self.event.attendee_count, 3)
+        self.assertEqual(registration.waitlist_position(self.event.pk, self.users[3].pk), 1)
+
+    def test_bulk_unregister_promotes_each_freed_seat(self):
+        other = Event.objects.create(name='Other', start_date=self.event.start_date, end_date=self.event.end_date,
+                                     capacity=1, created_by=self.creator)
+        registration.register_attendee(other.pk, self.users[0].pk)
+        registration.join_waitlist(self.event.pk, self.users[1].pk)
+        registration.join_waitlist(other.pk, self.users[2].pk)
+
+        registration.unregister_events(self.users[0].pk, [self.event.pk, other.pk])
+
+        self.assertEqual(self._attendees(), {self.users[1].pk})
+        self.assertEqual(set(other.attendees.values_list('pk', flat=True)), {self.users[2].pk})
+
+        registration.join_waitlist(self.event.pk, self.users[3].pk)
+        registration.unregister_attendees(self.event.pk, [self.users[1].pk])
+        self.assertEqual(self._attendees(), {self.users[3].pk})
+
+    def test_promotion_round_trips(self):
+        registration.join_waitlist(self.event.pk, self.users[1].pk)
+
+        with CaptureQueriesContext(connection) as context:
+            registration.unregister_attendee(self.event.pk, self.users[0].pk)
+
+        # unregister: delete + counter update; promotion: head + claim + insert + reservation
+        statements = [q['sql'] for q in context.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 6)
+
+
+class ConcurrentRegistrationTest(TransactionTestCase):
+    capacity = 5
+    workers = 8
+    users = 40
+
+    def setUp(self):
+        creator = User.objects.create(username='creator')
+        self.users = [User.objects.create(username=f'user{i}') for i in range(self.users)]
+        self.event = Event.objects.create(
+            name='Popular Event',
+            start_date=timezone.now() + timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=2),
+            capacity=self.capacity,
+            created_by=creator
+            )
+
+    def _register(self, user_id, barrier):
+        barrier.wait()
+        try:
+            while True:
+                try:
+                    return registration.register_attendee(self.event.pk, user_id)
+                except OperationalError:
+                    # sqlite reports lock contention instead of blocking, retry like a client would
+                    time.sleep(0.001)
+        finally:
+            connection.close()
+
+    def test_concurrent_registrations_never_oversell(self):
+        barrier = threading.Barrier(self.workers)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(lambda user: self._register(user.pk, barrier), self.users[:self.workers]))
+            results += list(executor.map(lambda user: self._register(user.pk, threading.Barrier(1)),
+                                         self.users[self.workers:]))
+
+        self.event.refresh_from_db()
+        self.assertEqual(results.count(registration.REGISTERED), self.capacity)
+        self.assertEqual(results.count(registration.FULL), len(self.users) - self.capacity)
+        self.assertEqual(self.event.attendee_count, self.capacity)
+        self.assertEqual(self.event.attendees.count(), self.capacity)
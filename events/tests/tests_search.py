@@ -0,0 +1,105 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import (
+    TestCase,
+    override_settings,
+    )
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import (
+    APIClient,
+    APITestCase,
+    )
+
+from events.models import Event
+from events.search import (
+    SQLiteFTSSearchBackend,
+    get_search_backend,
+    )
+
+
+class SearchViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.start = timezone.now() + timedelta(days=1)
+        self.python = self._create('Python meetup', 'Talks about Django and asyncio')
+        self.rust = self._create('Rust workshop', 'Bring a laptop, we will compare it with Python')
+        self.cooking = self._create('Cooking class', None)
+
+    def _create(self, name, description, start_date=None):
+        start_date = start_date or self.start
+        return Event.objects.create(
+            name=name,
+            description=description,
+            start_date=start_date,
+            end_date=start_date + timedelta(hours=2),
+            capacity=10,
+            created_by=self.user
+            )
+
+    def _search(self, params):
+        response = self.client.get(reverse('Events-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def _names(self, params):
+        return [event['name'] for event in self._search(params).data['results']]
+
+    def test_results_are_ranked(self):
+        # name matches outrank description matches
+        self.assertEqual(self._names({'q': 'python'}), ['Python meetup', 'Rust workshop'])
+
+    def test_search_description(self):
+        self.assertEqual(self._names({'q': 'laptop'}), ['Rust workshop'])
+
+    def test_prefix_match_on_last_term(self):
+        self.assertEqual(self._names({'q': 'djan'}), ['Python meetup'])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._names({'q': 'python laptop'}), ['Rust workshop'])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self._names({'q': 'python" OR "cooking'}), [])
+        self.assertEqual(self._names({'q': '***'}), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.cooking.name = 'Python for cooks'
+        self.cooking.save()
+        self.rust.delete()
+
+        self.assertEqual(self._names({'q': 'python'}), ['Python for cooks', 'Python meetup'])
+        self.assertEqual(self._names({'q': 'cooking'}), [])
+
+    def test_search_is_paginated(self):
+        for i in range(4):
+            self._create(f'Python sprint {i}', None)
+
+        response = self._search({'q': 'python', 'page_size': 4})
+
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_search_combines_with_filters_and_ordering(self):
+        self._create('Python past', None, start_date=timezone.now() - timedelta(days=3))
+
+        # same end_date, ties are broken on -id
+        self.assertEqual(self._names({'q': 'python', 'future': 'true', 'ordering': '-end_date'}),
+                         ['Rust workshop', 'Python meetup'])
+        self.assertEqual(self._names({'q': 'python', 'past': 'true'}), ['Python past'])
+
+    @override_settings(EVENTS_SEARCH_BACKEND='events.search.SubstringSearchBackend')
+    def test_substring_backend(self):
+        self.assertEqual(self._names({'q': 'Python'}), ['Python meetup', 'Rust workshop'])
+
+
+class SearchBackendTest(TestCase):
+    def test_default_backend_for_sqlite(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+
+    def test_build_match(self):
+        self.assertEqual(SQLiteFTSSearchBackend.build_match('Python  "meetup'), '"Python" "meetup"*')
+        self.assertIsNone(SQLiteFTSSearchBackend.build_match('"*'))
@@ -1,10 +1,19 @@
 from datetime import datetime, timedelta
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import (
+    TestCase,
+    override_settings,
+    )
+from django.utils import timezone
 import pytz
+from rest_framework.renderers import JSONRenderer
 
 from events.models import Event
-from events.serializers import EventSerializer
+from events.serializers import (
+    EventCompactSerializer,
+    EventSerializer,
+    EventValuesSerializer,
+    )
 
 
 class EventSerializerTest(TestCase):
@@ -23,10 +32,31 @@ class EventSerializerTest(TestCase):
         data = self.serializer.data
         self.assertEqual(
             set(data.keys()),
-            {'pk', 'name', 'start_date', 'end_date', 'description', 'capacity', 'attendees', 'created_by',
-             'created', 'updated'}
+            {'pk', 'name', 'start_date', 'end_date', 'description', 'capacity', 'attendees', 'attendee_count',
+             'seats_remaining', 'created_by', 'created', 'updated'}
         )
 
+    def test_serializer_contains_seat_counts(self):
+        self.event.attendees.add(User.objects.create(username='attendee'))
+        self.event.refresh_from_db()
+
+        data = EventSerializer(instance=self.event).data
+
+        self.assertEqual(data['attendee_count'], 1)
+        self.assertEqual(data['seats_remaining'], 99)
+
+    def test_serializer_ignores_attendee_count_input(self):
+        serializer = EventSerializer(data={
+            'name': 'Valid Event',
+            'start_date': (datetime.now() + timedelta(days=1)).isoformat(),
+            'end_date': (datetime.now() + timedelta(days=2)).isoformat(),
+            'capacity': 50,
+            'attendee_count': 50,
+        })
+
+        self.assertTrue(serializer.is_valid())
+        self.assertNotIn('attendee_count', serializer.validated_data)
+
     def test_serializer_validates_end_date_before_start_date(self):
         serializer = EventSerializer(data={
             'name': 'Invalid Event',
@@ -72,3 +102,50 @@ class EventSerializerTest(TestCase):
         })
 
         self.assertTrue(serializer.is_valid())
+
+
+class EventValuesSerializerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        attendees = [User.objects.create(username=f'attendee{i}') for i in range(3)]
+        start = timezone.now().replace(microsecond=123456) + timedelta(days=1)
+        self.events = [
+            Event.objects.create(name='With description', description='Text', start_date=start,
+                                 end_date=start + timedelta(hours=2), capacity=2, created_by=self.user),
+            Event.objects.create(name='Without description', start_date=start.replace(microsecond=0),
+                                 end_date=start + timedelta(days=1), capacity=10, created_by=self.user),
+            ]
+        self.events[0].attendees.add(*attendees)
+        self.events[1].attendees.add(attendees[1])
+
+    def _render(self, serializer_class, fields=None):
+        instances = Event.objects.select_related('created_by').prefetch_related('attendees').order_by('id')
+        rows = Event.objects.values(*EventValuesSerializer.columns(fields or EventSerializer.Meta.fields))
+        return (JSONRenderer().render(serializer_class(instances, many=True, fields=fields).data),
+                JSONRenderer().render(EventValuesSerializer(rows.order_by('id'), many=True, fields=fields).data))
+
+    def test_same_output_as_event_serializer(self):
+        expected, output = self._render(EventSerializer)
+
+        self.assertEqual(output, expected)
+
+    def test_same_output_with_fields(self):
+        expected, output = self._render(EventSerializer, fields=['name', 'updated', 'attendees', 'pk'])
+        self.assertEqual(output, expected)
+
+        expected, output = self._render(EventCompactSerializer, fields=EventCompactSerializer.Meta.fields)
+        self.assertEqual(output, expected)
+
+    @override_settings(TIME_ZONE='Europe/Warsaw')
+    def test_same_output_in_other_timezone(self):
+        expected, output = self._render(EventSerializer)
+
+        self.assertEqual(output, expected)
+        self.assertNotIn(b'Z"', output)
+
+    def test_single_row(self):
+        row = Event.objects.values(*EventValuesSerializer.columns(['pk', 'attendees'])).get(pk=self.events[1].pk)
+
+        data = EventValuesSerializer(row, fields=['pk', 'attendees']).data
+
+        self.assertEqual(data, {'pk': self.events[1].pk, 'attendees': [self.events[1].attendees.get().pk]})
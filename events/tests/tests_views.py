@@ -3,6 +3,9 @@ from datetime import (
     timedelta,
     )
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 import pytz
@@ -14,6 +17,7 @@ from rest_framework.test import (
     force_authenticate,
     )
 
+from events import cache
 from events.models import Event
 from events.views import EventViewSet
 
@@ -136,6 +140,18 @@ class EventViewSetTest(APITestCase):
         self.assertEqual(response.data['user_id'], self.user.id)
         self.assertEqual(response.data['message'], 'The event has already started, you cannot register to it.')
 
+    def test_register_endpoint_already_registered(self):
+        self.event.start_date = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=1)
+        self.event.save()
+        self.client.post(f'{self.url}register/')
+
+        response = self.client.post(f'{self.url}register/')
+
+        self.event.refresh_from_db()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['message'], f'User: {self.user.id} is already registered for event: {self.event.pk}')  # noqa
+        self.assertEqual(self.event.attendee_count, 1)
+
     def test_unregister_endpoint(self):
         self.event.attendees.add(self.user)
         self.event.save()
@@ -170,8 +186,23 @@ class EventViewSetTest(APITestCase):
         response = self.client.get(reverse('Events-list'), {'date': '2023-03-05'})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Event 1')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Event 1')
+
+    def test_filter_by_date_uses_day_boundaries(self):
+        for name, start in (('Before', '2023-03-04T23:59:59Z'), ('Start', '2023-03-05T00:00:00Z'),
+                            ('End', '2023-03-05T23:59:59Z'), ('After', '2023-03-06T00:00:00Z')):
+            Event.objects.create(name=name, start_date=start, end_date=start, capacity=10, created_by=self.user)
+
+        response = self.client.get(reverse('Events-list'), {'date': '2023-03-05'})
+
+        self.assertEqual([e['name'] for e in response.data['results']], ['Start', 'End'])
+
+    def test_filter_by_invalid_date(self):
+        response = self.client.get(reverse('Events-list'), {'date': '2023-13-05'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date', response.data)
 
     def test_filter_past_events(self):
         Event.objects.create(
@@ -192,9 +223,9 @@ class EventViewSetTest(APITestCase):
         response = self.client.get(reverse('Events-list'), {'past': 'true'})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertEqual(response.data[0]['name'], 'Test Event')
-        self.assertEqual(response.data[1]['name'], 'Event 1')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['results'][0]['name'], 'Event 1')
+        self.assertEqual(response.data['results'][1]['name'], 'Test Event')
 
     def test_filter_future_events(self):
         Event.objects.create(
@@ -222,5 +253,713 @@ class EventViewSetTest(APITestCase):
         response = self.client.get(reverse('Events-list'), {'future': 'true'})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Event 2')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Event 2')
+
+    def test_filter_has_seats(self):
+        full = Event.objects.create(
+            name='Full Event',
+            start_date=(datetime.utcnow().replace(tzinfo=pytz.utc) + timezone.timedelta(days=1)).isoformat(),
+            end_date=(datetime.utcnow().replace(tzinfo=pytz.utc) + timezone.timedelta(days=1, hours=1)).isoformat(),
+            capacity=1,
+            created_by=self.user
+            )
+        full.attendees.add(self.user)
+
+        response = self.client.get(reverse('Events-list'), {'has_seats': 'true'})
+        self.assertEqual([e['name'] for e in response.data['results']], ['Test Event'])
+
+        response = self.client.get(reverse('Events-list'), {'has_seats': 'false'})
+        self.assertEqual([e['name'] for e in response.data['results']], ['Full Event'])
+        self.assertEqual(response.data['results'][0]['seats_remaining'], 0)
+
+
+class EventSparseFieldsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        start = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=1)
+        self.event = Event.objects.create(name='Test Event', description='A long description', start_date=start,
+                                          end_date=start + timedelta(hours=2), capacity=10, created_by=self.user)
+        self.event.attendees.add(self.user)
+
+    def _captured(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response, [q['sql'] for q in context.captured_queries]
+
+    def test_fields(self):
+        response, queries = self._captured(reverse('Events-list'), {'fields': 'pk,name'})
+
+        self.assertEqual(response.data['results'], [{'pk': self.event.pk, 'name': 'Test Event'}])
+        # no attendee prefetch, no creator join, no description column
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[1])
+        self.assertNotIn('auth_user', queries[1])
+
+    def test_omit(self):
+        response, queries = self._captured(f'/events/{self.event.pk}/', {'omit': 'attendees,description'})
+
+        self.assertNotIn('attendees', response.data)
+        self.assertNotIn('description', response.data)
+        self.assertEqual(response.data['created_by'], 'testuser')
+        self.assertEqual(response.data['seats_remaining'], 9)
+        self.assertFalse(any('events_event_attendees' in query for query in queries))
+
+    def test_compact(self):
+        response = self.client.get(reverse('Events-list'), {'compact': 'true'})
+
+        event = response.data['results'][0]
+        self.assertEqual(set(event), {'pk', 'name', 'start_date', 'end_date', 'capacity', 'attendee_count',
+                                      'seats_remaining', 'created_by', 'created', 'updated'})
+        self.assertEqual(event['attendee_count'], 1)
+
+    def test_compact_with_fields(self):
+        response = self.client.get(reverse('Events-list'), {'compact': 'true', 'fields': 'name,attendee_count'})
+
+        self.assertEqual(response.data['results'], [{'name': 'Test Event', 'attendee_count': 1}])
+
+    def test_unknown_fields(self):
+        response = self.client.get(reverse('Events-list'), {'fields': 'name,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['fields'], ['Unknown field(s): secret.'])
+
+        response = self.client.get(reverse('Events-list'), {'compact': 'true', 'omit': 'attendees'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('Events-list'), {'compact': 'maybe'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fast_read_serializer_matches_model_serializer(self):
+        Event.objects.create(name='Later', start_date=self.event.start_date + timedelta(days=1),
+                             end_date=self.event.end_date + timedelta(days=1), capacity=1, created_by=self.user)
+
+        for params in ({}, {'compact': 'true'}, {'fields': 'pk,attendees,updated'}, {'ordering': '-end_date'},
+                       {'q': 'event'}, {'page_size': 1}):
+            cache.get_cache().clear()
+            fast = self.client.get(reverse('Events-list'), params)
+            cache.get_cache().clear()
+            with override_settings(EVENTS_FAST_READ_SERIALIZER=False):
+                model = self.client.get(reverse('Events-list'), params)
+
+            self.assertEqual(fast.content, model.content, params)
+
+    def test_sparse_pages_keep_cursors(self):
+        Event.objects.create(name='Later', start_date=self.event.start_date + timedelta(days=1),
+                             end_date=self.event.end_date + timedelta(days=1), capacity=1, created_by=self.user)
+
+        first = self.client.get(reverse('Events-list'), {'fields': 'name', 'page_size': 1})
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(second.data['results'], [{'name': 'Later'}])
+
+
+class EventAttendeesViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='creator')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        start = timezone.now() + timedelta(days=1)
+        self.event = Event.objects.create(name='Test Event', start_date=start, end_date=start + timedelta(hours=2),
+                                          capacity=10, created_by=self.user)
+        self.attendees = [User.objects.create(username=name) for name in ('carol', 'alice', 'bob', 'alan')]
+        self.event.attendees.add(*self.attendees)
+        self.url = f'/events/{self.event.pk}/attendees/'
+
+    def _walk(self, params):
+        results = []
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            results.extend(response.data['results'])
+            if not response.data['next']:
+                return results
+            response = self.client.get(response.data['next'])
+
+    def test_attendees(self):
+        results = self._walk({'page_size': 3})
+
+        self.assertEqual(results, [{'user_id': a.pk, 'username': a.username} for a in self.attendees])
+
+    def test_attendees_ordering(self):
+        results = self._walk({'ordering': 'username', 'page_size': 1})
+        self.assertEqual([a['username'] for a in results], ['alan', 'alice', 'bob', 'carol'])
+
+        results = self._walk({'ordering': '-user_id', 'page_size': 3})
+        self.assertEqual([a['user_id'] for a in results], [a.pk for a in reversed(self.attendees)])
+
+        response = self.client.get(self.url, {'ordering': 'email'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.data)
+
+    def test_attendees_username_filter(self):
+        results = self._walk({'username': 'Al', 'ordering': 'username'})
+
+        self.assertEqual([a['username'] for a in results], ['alan', 'alice'])
+
+    def test_attendees_query_count(self):
+        # event lookup + one page of the attendance table joined to the usernames
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {'page_size': 2})
+
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertNotIn('password', context.captured_queries[1]['sql'])
+
+    def test_attendees_unknown_event(self):
+        response = self.client.get(f'/events/{self.event.pk + 1}/attendees/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detail_does_not_inline_attendees(self):
+        response = self.client.get(f'/events/{self.event.pk}/')
+        self.assertNotIn('attendees', response.data)
+        self.assertEqual(response.data['attendee_count'], 4)
+
+        response = self.client.get(f'/events/{self.event.pk}/', {'fields': 'attendees'})
+        self.assertEqual(sorted(response.data['attendees']), sorted(a.pk for a in self.attendees))
+
+
+class EventWaitlistViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='waiting')
+        self.attendee = User.objects.create(username='attendee')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        start = timezone.now() + timedelta(days=1)
+        self.event = Event.objects.create(name='Test Event', start_date=start, end_date=start + timedelta(hours=2),
+                                          capacity=1, created_by=self.attendee)
+        self.event.attendees.add(self.attendee)
+        self.url = f'/events/{self.event.pk}/waitlist/'
+
+    def test_join_and_leave(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'event_id': self.event.pk,
+            'user_id': self.user.pk,
+            'message': f'The event is full, user: {self.user.pk} was added to the waitlist for event: {self.event.pk}',
+            'position': 1,
+            })
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, {'event_id': self.event.pk, 'user_id': self.user.pk, 'position': 1})
+
+        response = self.client.delete(self.url)
+        self.assertEqual(response.data['message'],
+                         f'Removed user: {self.user.pk} from the waitlist for event: {self.event.pk}')
+        self.assertIsNone(response.data['position'])
+
+    def test_unregister_promotes_waiting_user(self):
+        self.client.post(self.url)
+        other = APIClient()
+        other.force_authenticate(user=self.attendee)
+
+        other.post(f'/events/{self.event.pk}/unregister/')
+
+        self.assertEqual(list(self.event.attendees.values_list('pk', flat=True)), [self.user.pk])
+        self.assertIsNone(self.client.get(self.url).data['position'])
+
+    def test_raised_capacity_promotes_waiting_user(self):
+        self.client.post(self.url)
+        creator = APIClient()
+        creator.force_authenticate(user=self.attendee)
+
+        response = creator.patch(f'/events/{self.event.pk}/', {'capacity': 2})
+
+        self.assertEqual(response.data['attendee_count'], 2)
+        self.assertIn(self.user.pk, self.event.attendees.values_list('pk', flat=True))
+
+    def test_attendees_are_not_writable(self):
+        creator = APIClient()
+        creator.force_authenticate(user=self.attendee)
+        others = [User.objects.create(username=f'other{i}').pk for i in range(2)]
+
+        response = creator.patch(f'/events/{self.event.pk}/', {'attendees': [self.user.pk, *others]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['attendee_count'], 1)
+        self.assertEqual(list(self.event.attendees.values_list('pk', flat=True)), [self.attendee.pk])
+
+    def test_update_cannot_empty_the_event_past_the_waitlist(self):
+        self.client.post(self.url)
+        creator = APIClient()
+        creator.force_authenticate(user=self.attendee)
+
+        creator.patch(f'/events/{self.event.pk}/', {'attendees': []}, format='json')
+
+        self.assertEqual(list(self.event.attendees.values_list('pk', flat=True)), [self.attendee.pk])
+        self.assertEqual(self.client.get(self.url).data['position'], 1)
+
+    def test_join_started_event(self):
+        Event.objects.filter(pk=self.event.pk).update(start_date=timezone.now() - timedelta(minutes=1))
+
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.data['message'], 'The event has already started, you cannot register to it.')
+        self.assertIsNone(response.data['position'])
+
+    def test_waitlist_unknown_event(self):
+        response = self.client.post(f'/events/{self.event.pk + 1}/waitlist/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EventMineViewTest(APITestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.user = User.objects.create(username='me')
+        self.other = User.objects.create(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        start = timezone.now() + timedelta(days=1)
+        self.created = [self._create(f'Mine {i}', self.user, start + timedelta(hours=i)) for i in range(3)]
+        self.others = [self._create(f'Other {i}', self.other, start + timedelta(hours=i)) for i in range(3)]
+        self.others[2].attendees.add(self.user)
+        self.others[0].attendees.add(self.user)
+        self.created[1].attendees.add(self.user, self.other)
+
+    @staticmethod
+    def _create(name, user, start):
+        return Event.objects.create(name=name, start_date=start, end_date=start + timedelta(hours=1), capacity=10,
+                                    created_by=user)
+
+    def _walk(self, url, params):
+        names = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            names.extend(event['name'] for event in response.data['results'])
+            if not response.data['next']:
+                return names
+            response = self.client.get(response.data['next'])
+
+    def test_created(self):
+        names = self._walk('/events/mine/created/', {'page_size': 2})
+
+        self.assertEqual(names, ['Mine 0', 'Mine 1', 'Mine 2'])
+
+    def test_attending(self):
+        names = self._walk('/events/mine/attending/', {'page_size': 2})
+
+        self.assertEqual(names, ['Other 0', 'Mine 1', 'Other 2'])
+
+    def test_filters_and_fields_apply(self):
+        response = self.client.get('/events/mine/attending/', {'created_by': self.other.pk, 'fields': 'name'})
+
+        self.assertEqual(response.data['results'], [{'name': 'Other 0'}, {'name': 'Other 2'}])
+
+    def test_single_query_per_page(self):
+        for url in ('/events/mine/created/', '/events/mine/attending/'):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, {'fields': 'pk,name,attendee_count'})
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(context.captured_queries), 1)
+
+    def test_summary(self):
+        response = self.client.get('/events/mine/summary/')
+        self.assertEqual(response.data, {'created': 3, 'attending': 3})
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get('/events/mine/summary/').data, {'created': 3, 'attending': 3})
+        self.assertEqual(len(context.captured_queries), 0)
+
+        self.client.post(f'/events/{self.others[1].pk}/register/')
+        self.assertEqual(self.client.get('/events/mine/summary/').data, {'created': 3, 'attending': 4})
+
+    def test_summary_is_per_user(self):
+        self.client.get('/events/mine/summary/')
+        self.client.force_authenticate(user=self.other)
+
+        self.assertEqual(self.client.get('/events/mine/summary/').data, {'created': 3, 'attending': 1})
+
+
+class EventBulkWriteViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.start = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=1)
+
+    def _row(self, i, **overrides):
+        return {
+            'name': f'Event {i}',
+            'start_date': (self.start + timedelta(hours=i)).isoformat(),
+            'end_date': (self.start + timedelta(hours=i + 1)).isoformat(),
+            'capacity': 10,
+            **overrides,
+            }
+
+    def test_bulk_create(self):
+        rows = [self._row(i) for i in range(50)]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/events/', rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['created']), 50)
+        self.assertEqual(Event.objects.filter(created_by=self.user).count(), 50)
+        self.assertEqual(Event.objects.get(pk=response.data['created'][3]).name, 'Event 3')
+        self.assertEqual(len([q for q in context.captured_queries if q['sql'].startswith('INSERT')]), 1)
+
+    def test_bulk_create_reports_row_errors(self):
+        rows = [
+            self._row(0),
+            self._row(1, end_date=(self.start - timedelta(days=2)).isoformat()),
+            self._row(2, capacity='many'),
+            ]
+
+        response = self.client.post('/events/', rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertEqual(response.data['errors'][0]['errors']['non_field_errors'][0], "Event can't end in the past.")
+        self.assertIn('capacity', response.data['errors'][1]['errors'])
+        self.assertEqual(Event.objects.count(), 0)
+
+    def test_bulk_create_size_limits(self):
+        self.assertEqual(self.client.post('/events/', [], format='json').status_code, 400)
+        rows = [self._row(0)] * (EventViewSet.bulk_max_rows + 1)
+        self.assertEqual(self.client.post('/events/', rows, format='json').status_code, 400)
+
+    def test_bulk_update(self):
+        pks = self.client.post('/events/', [self._row(i) for i in range(3)], format='json').data['created']
+        before = Event.objects.get(pk=pks[0]).updated
+
+        response = self.client.patch('/events/bulk/', [
+            {'pk': pks[0], 'name': 'Renamed'},
+            {'pk': pks[2], 'capacity': 99, 'description': 'Bigger room'},
+            ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], [pks[0], pks[2]])
+        first = Event.objects.get(pk=pks[0])
+        self.assertEqual(first.name, 'Renamed')
+        self.assertGreater(first.updated, before)
+        self.assertEqual(Event.objects.get(pk=pks[1]).name, 'Event 1')
+        self.assertEqual(Event.objects.get(pk=pks[2]).capacity, 99)
+
+    def test_bulk_update_reports_row_errors(self):
+        pks = self.client.post('/events/', [self._row(i) for i in range(2)], format='json').data['created']
+        foreign = Event.objects.create(name='Foreign', start_date=self.start, end_date=self.start,
+                                       capacity=1, created_by=User.objects.create(username='other'))
+
+        response = self.client.patch('/events/bulk/', [
+            {'pk': pks[0], 'name': 'Renamed'},
+            {'pk': pks[1], 'end_date': (self.start - timedelta(hours=1)).isoformat()},
+            {'pk': foreign.pk, 'name': 'Mine now'},
+            {'pk': 0, 'name': 'Missing'},
+            {'name': 'No pk'},
+            {'pk': True, 'name': 'Boolean pk'},
+            ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4, 5])
+        self.assertEqual(response.data['errors'][4]['errors'], {'pk': ['Event not found.']})
+        self.assertEqual(response.data['errors'][0]['errors']['non_field_errors'][0],
+                         "Event can't end before it starts.")
+        self.assertEqual(Event.objects.get(pk=pks[0]).name, 'Event 0')
+
+    def test_partial_update_of_single_event(self):
+        pk = self.client.post('/events/', self._row(0), format='json').data['pk']
+
+        response = self.client.patch(f'/events/{pk}/', {'name': 'Renamed'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Renamed')
+
+
+class EventBulkRegistrationViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.users = [User.objects.create(username=f'user{i}') for i in range(3)]
+        start = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=1)
+        self.event = Event.objects.create(name='Test Event', start_date=start, end_date=start + timedelta(hours=2),
+                                          capacity=10, created_by=self.user)
+        self.other_event = Event.objects.create(name='Other Event', start_date=start,
+                                                end_date=start + timedelta(hours=2), capacity=10,
+                                                created_by=self.users[0])
+
+    def test_register_users(self):
+        response = self.client.post(f'/events/{self.event.pk}/register-users/',
+                                    {'user_ids': [self.users[0].pk, self.users[1].pk]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'event_id': self.event.pk,
+            'results': [
+                {'user_id': self.users[0].pk, 'result': 'registered'},
+                {'user_id': self.users[1].pk, 'result': 'registered'},
+                ],
+            })
+        self.assertEqual(self.event.attendees.count(), 2)
+
+    def test_unregister_users(self):
+        self.event.attendees.add(self.users[0])
+
+        response = self.client.post(f'/events/{self.event.pk}/unregister-users/',
+                                    {'user_ids': [self.users[0].pk]}, format='json')
+
+        self.assertEqual(response.data['results'], [{'user_id': self.users[0].pk, 'result': 'unregistered'}])
+        self.assertEqual(self.event.attendees.count(), 0)
+
+    def test_register_users_permission_denied(self):
+        response = self.client.post(f'/events/{self.other_event.pk}/register-users/',
+                                    {'user_ids': [self.users[1].pk]}, format='json')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.other_event.attendees.count(), 0)
+
+    def test_register_users_invalid_payload(self):
+        response = self.client.post(f'/events/{self.event.pk}/register-users/', {'user_ids': []}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('user_ids', response.data)
+
+    def test_register_and_unregister_many(self):
+        event_ids = [self.event.pk, self.other_event.pk]
+
+        response = self.client.post('/events/register-many/', {'event_ids': event_ids}, format='json')
+        self.assertEqual(response.data, {
+            'user_id': self.user.pk,
+            'results': [
+                {'event_id': self.event.pk, 'result': 'registered'},
+                {'event_id': self.other_event.pk, 'result': 'registered'},
+                ],
+            })
+
+        response = self.client.post('/events/unregister-many/', {'event_ids': event_ids}, format='json')
+        self.assertEqual([item['result'] for item in response.data['results']], ['unregistered', 'unregistered'])
+        self.assertEqual(self.user.attendees.count(), 0)
+
+
+class EventFilterTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.other = User.objects.create(username='other')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        now = datetime.utcnow().replace(tzinfo=pytz.utc)
+        self.past = Event.objects.create(name='Past', start_date=now - timedelta(days=2),
+                                         end_date=now - timedelta(days=1), capacity=5, created_by=self.user)
+        self.soon = Event.objects.create(name='Soon', start_date=now + timedelta(days=1),
+                                         end_date=now + timedelta(days=3), capacity=50, created_by=self.other)
+        self.later = Event.objects.create(name='Later', start_date=now + timedelta(days=10),
+                                          end_date=now + timedelta(days=11), capacity=1, created_by=self.user)
+        self.soon.attendees.add(self.user)
+        self.later.attendees.add(self.other)
+
+    def _names(self, params):
+        response = self.client.get(reverse('Events-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [event['name'] for event in response.data['results']]
+
+    def test_false_booleans_are_not_truthy(self):
+        self.assertEqual(self._names({'past': 'false'}), ['Soon', 'Later'])
+        self.assertEqual(self._names({'future': 'false'}), ['Past'])
+
+    def test_start_range(self):
+        start_after = (datetime.utcnow() + timedelta(hours=1)).date().isoformat()
+        start_before = (datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=5)).isoformat()
+
+        self.assertEqual(self._names({'start_after': start_after, 'start_before': start_before}), ['Soon'])
+
+    def test_end_range(self):
+        end_after = (datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=2)).isoformat()
+
+        self.assertEqual(self._names({'end_after': end_after}), ['Soon', 'Later'])
+
+    def test_created_by(self):
+        self.assertEqual(self._names({'created_by': self.user.pk}), ['Past', 'Later'])
+
+    def test_attending(self):
+        self.assertEqual(self._names({'attending': 'true'}), ['Soon'])
+        self.assertEqual(self._names({'attending': 'false'}), ['Past', 'Later'])
+
+    def test_capacity_and_availability(self):
+        self.assertEqual(self._names({'min_capacity': 5, 'max_capacity': 10}), ['Past'])
+        self.assertEqual(self._names({'has_seats': 'false'}), ['Later'])
+
+    def test_ordering(self):
+        self.assertEqual(self._names({'ordering': '-start_date'}), ['Later', 'Soon', 'Past'])
+        self.assertEqual(self._names({'ordering': 'end_date'}), ['Past', 'Soon', 'Later'])
+
+    def test_unsupported_ordering_is_ignored(self):
+        self.assertEqual(self._names({'ordering': 'description'}), ['Past', 'Soon', 'Later'])
+
+    def test_descending_ordering_pages(self):
+        first = self.client.get(reverse('Events-list'), {'ordering': '-start_date', 'page_size': 2})
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual([e['name'] for e in second.data['results']], ['Past'])
+
+    def test_invalid_values(self):
+        for param, value in (('created_by', 'abc'), ('past', 'maybe'), ('start_after', 'yesterday'),
+                             ('created_by', '99999999999999999999999'), ('min_capacity', str(2 ** 63)),
+                             ('max_capacity', str(-2 ** 63 - 1)), ('date', '9999-12-31')):
+            response = self.client.get(reverse('Events-list'), {param: value})
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(param, response.data)
+
+
+class EventPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        start = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=1)
+        for i in range(5):
+            Event.objects.create(
+                name=f'Event {i}',
+                start_date=start + timedelta(hours=i),
+                end_date=start + timedelta(hours=i + 1),
+                capacity=10,
+                created_by=self.user
+                )
+        # two events starting at the same time to exercise the id tie-breaker
+        for name in ('Tie A', 'Tie B'):
+            Event.objects.create(
+                name=name,
+                start_date=start + timedelta(hours=10),
+                end_date=start + timedelta(hours=11),
+                capacity=10,
+                created_by=self.user
+                )
+
+    def _collect_pages(self, params):
+        names = []
+        response = self.client.get(reverse('Events-list'), params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names.extend(event['name'] for event in response.data['results'])
+            if not response.data['next']:
+                return names
+            response = self.client.get(response.data['next'])
+
+    def test_response_contains_cursors(self):
+        response = self.client.get(reverse('Events-list'), {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data.keys()), {'next', 'previous', 'results'})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIn('cursor=', response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_walk_all_pages_in_start_date_order(self):
+        names = self._collect_pages({'page_size': 2})
+
+        self.assertEqual(names, ['Event 0', 'Event 1', 'Event 2', 'Event 3', 'Event 4', 'Tie A', 'Tie B'])
+
+    def test_previous_cursor(self):
+        first = self.client.get(reverse('Events-list'), {'page_size': 3})
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertEqual(previous.data['results'], first.data['results'])
+
+    def test_pagination_with_filters(self):
+        Event.objects.create(
+            name='Past Event',
+            start_date=datetime.strptime('2023-03-05', '%Y-%m-%d').replace(tzinfo=pytz.utc),
+            end_date=datetime.strptime('2023-03-06', '%Y-%m-%d').replace(tzinfo=pytz.utc),
+            capacity=10,
+            created_by=self.user
+            )
+
+        names = self._collect_pages({'page_size': 2, 'future': 'true'})
+
+        self.assertEqual(len(names), 7)
+        self.assertNotIn('Past Event', names)
+
+    def test_walk_past_offset_cutoff_with_shared_start_date(self):
+        start = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=30)
+        events = Event.objects.bulk_create(
+            Event(name=f'Same {i}', start_date=start, end_date=start + timedelta(hours=1), capacity=10,
+                  created_by=self.user) for i in range(1600))
+
+        with CaptureQueriesContext(connection) as context:
+            names = self._collect_pages({'page_size': 500, 'fields': 'name', 'start_after': start.isoformat()})
+
+        self.assertEqual(names, [event.name for event in events])
+        self.assertFalse(any('OFFSET' in query['sql'] for query in context.captured_queries))
+
+    def test_walk_backwards_with_shared_start_date(self):
+        first = self.client.get(reverse('Events-list'), {'page_size': 2, 'ordering': '-start_date'})
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertEqual([e['name'] for e in first.data['results']], ['Tie B', 'Tie A'])
+        self.assertEqual([e['name'] for e in second.data['results']], ['Event 4', 'Event 3'])
+        self.assertEqual(previous.data['results'], first.data['results'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('Events-list'), {'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_max_page_size(self):
+        response = self.client.get(reverse('Events-list'), {'page_size': 10000})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 7)
+
+
+class EventListQueryCountTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.attendees = [User.objects.create(username=f'attendee{i}') for i in range(3)]
+
+    def _create_events(self, count):
+        start = datetime.utcnow().replace(tzinfo=pytz.utc) + timedelta(days=1)
+        for i in range(count):
+            creator = User.objects.create(username=f'creator{Event.objects.count()}')
+            event = Event.objects.create(
+                name=f'Event {i}',
+                start_date=start + timedelta(hours=i),
+                end_date=start + timedelta(hours=i + 1),
+                capacity=10,
+                created_by=creator
+                )
+            event.attendees.add(*self.attendees)
+
+    # ETag/Last-Modified aggregate, page, attendee ids
+    def test_list_query_count_is_constant(self):
+        self._create_events(1)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('Events-list'))
+        self.assertEqual(len(response.data['results']), 1)
+
+        self._create_events(30)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('Events-list'))
+        self.assertEqual(len(response.data['results']), 31)
+
+    def test_list_serializes_attendees_and_creator(self):
+        self._create_events(2)
+
+        response = self.client.get(reverse('Events-list'))
+
+        for event in response.data['results']:
+            self.assertEqual(sorted(event['attendees']), sorted(a.pk for a in self.attendees))
+            self.assertTrue(event['created_by'].startswith('creator'))
+
+    def test_retrieve_query_count(self):
+        self._create_events(1)
+        event = Event.objects.get()
+
+        # attendee ids are not inlined in the detail by default: validators + row
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/events/{event.pk}/')
+        self.assertNotIn('attendees', response.data)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/events/{event.pk}/', {'fields': 'pk,attendees'})
+        self.assertEqual(len(response.data['attendees']), 3)
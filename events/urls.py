@@ -1,2 +1,13 @@
+from django.urls import path
+
+from . import async_views
+
+
+# async (ASGI) versions of the main EventViewSet endpoints, mounted under /async/
 urlpatterns = [
-]
\ No newline at end of file
+    path('events/', async_views.event_list, name='async-events-list'),
+    path('events/stream/', async_views.event_stream, name='async-events-stream'),
+    path('events/<int:pk>/', async_views.event_detail, name='async-events-detail'),
+    path('events/<int:pk>/register/', async_views.event_register, name='async-events-register'),
+    path('events/<int:pk>/unregister/', async_views.event_unregister, name='async-events-unregister'),
+    ]
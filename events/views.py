@@ -1,52 +1,294 @@
-from datetime import datetime
+from functools import partial
+from django.conf import settings
+from django.db import transaction
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
 from django.utils import timezone
-import pytz
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import (
+    PermissionDenied,
+    ValidationError,
+    )
+from rest_framework.permissions import (
+    IsAdminUser,
+    IsAuthenticated,
+    )
+from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from auth.authentication import get_user_instance
+from . import (
+    cache,
+    conditional,
+    export,
+    notifications,
+    registration,
+    )
+from .filters import (
+    EventFilterBackend,
+    EventOrderingFilter,
+    EventSearchFilter,
+    parse_bool,
+    )
 from .models import Event
-from .serializers import EventSerializer
+from .pagination import (
+    AttendeeCursorPagination,
+    EventCursorPagination,
+    EventSearchPagination,
+    )
+from .serializers import (
+    EVENT_FIELD_COLUMNS,
+    AttendeeSerializer,
+    EventBulkSerializer,
+    EventCompactSerializer,
+    EventIdsSerializer,
+    EventSerializer,
+    EventValuesSerializer,
+    UserIdsSerializer,
+    )
+
+
+# message returned by the register endpoints for a registration.register_attendee() result
+def register_message(result, user_id, event_id):
+    if result == registration.FULL:
+        return 'The attendance list for this event is full. You cannot register at this time.'
+    if result == registration.STARTED:
+        return 'The event has already started, you cannot register to it.'
+    if result == registration.ALREADY_REGISTERED:
+        return f'User: {user_id} is already registered for event: {event_id}'
+    return f'Registered user: {user_id} for event: {event_id}'
+
+
+def waitlist_message(result, user_id, event_id):
+    if result == registration.WAITLISTED:
+        return f'The event is full, user: {user_id} was added to the waitlist for event: {event_id}'
+    if result == registration.ALREADY_WAITLISTED:
+        return f'User: {user_id} is already on the waitlist for event: {event_id}'
+    if result == registration.LEFT_WAITLIST:
+        return f'Removed user: {user_id} from the waitlist for event: {event_id}'
+    if result == registration.NOT_WAITLISTED:
+        return f'User: {user_id} is not on the waitlist for event: {event_id}'
+    return register_message(result, user_id, event_id)
 
 
 class EventViewSet(ModelViewSet):
     serializer_class = EventSerializer
     queryset = Event.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = EventCursorPagination
+    filter_backends = [EventFilterBackend, EventOrderingFilter, EventSearchFilter]
+    ordering = ('start_date', 'id')
+    # rows accepted by one bulk create/update request, and rows per UPDATE statement
+    bulk_max_rows = 1000
+    bulk_batch_size = 500
+    # actions returning a page of events, read like the list
+    list_actions = ('list', 'mine_created', 'mine_attending')
+
+    # ranked search results are paged by page number, everything else by cursor
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = self.request
+            if request is not None and request.query_params.get(EventSearchFilter.search_param, '').strip():
+                self._paginator = EventSearchPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    # list and retrieve go through the response cache and answer conditional GETs with 304
+    def list(self, request, *args, **kwargs):
+        build = partial(super().list, request, *args, **kwargs)
+        validators = partial(conditional.list_validators, request, self.filter_queryset(self.get_queryset()),
+                             cache.request_digest(request))
+        return cache.cached_response(request, cache.list_key(request), build, validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        build = partial(super().retrieve, request, *args, **kwargs)
+        validators = partial(conditional.detail_validators, request, self.filter_queryset(self.get_queryset()),
+                             kwargs['pk'], cache.request_digest(request))
+        return cache.cached_response(request, cache.detail_key(request, kwargs['pk']), build, validators)
+
+    # one `now` per request, so every row of a bulk request is validated against the same instant
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'now': timezone.now()}
+
+    # a list of events is created in bulk
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
 
     # fills 'created_by' field with the user that creates the object
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        serializer.save(created_by=get_user_instance(self.request.user))
+
+    @staticmethod
+    def _row_errors(errors):
+        return [{'index': index, 'errors': row} for index, row in enumerate(errors) if row]
+
+    def _check_bulk_size(self, rows):
+        if not rows:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of events.']})
+        if len(rows) > self.bulk_max_rows:
+            raise ValidationError({'non_field_errors': [f'At most {self.bulk_max_rows} events per request.']})
+
+    # validates the whole batch in one pass and inserts it with bulk_create, all rows or none
+    def bulk_create(self, request):
+        self._check_bulk_size(request.data)
+        serializer = EventBulkSerializer(data=request.data, many=True, context=self.get_serializer_context())
+        if not serializer.is_valid():
+            return Response({'errors': self._row_errors(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            events = serializer.save(created_by=get_user_instance(request.user))
+        cache.invalidate_events(event.pk for event in events)
+        notifications.notify(notifications.CREATED, [event.pk for event in events])
+
+        return Response({'created': [event.pk for event in events]}, status=status.HTTP_201_CREATED)
+
+    # partial update of many events of the current user, written with bulk_update, all rows or none
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_update(self, request):
+        rows = request.data if isinstance(request.data, list) else None
+        if rows is None:
+            raise ValidationError({'non_field_errors': ['Expected a list of events.']})
+        self._check_bulk_size(rows)
+
+        # bool is a subclass of int, `true` must not address event 1
+        pks = [row.get('pk') if isinstance(row, dict) and type(row.get('pk')) is int else None for row in rows]
+        events = Event.objects.in_bulk([pk for pk in pks if pk is not None])
+        context = self.get_serializer_context()
+
+        errors = []
+        updated = {}
+        fields = set()
+        for pk, row in zip(pks, rows):
+            event = events.get(pk)
+            if event is None:
+                errors.append({'pk': ['Event not found.']})
+                continue
+            if event.created_by_id != request.user.id:
+                errors.append({'pk': ['To update an event, you must be the creator of that event.']})
+                continue
+
+            serializer = EventBulkSerializer(event, data=row, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+
+            for field, value in serializer.validated_data.items():
+                setattr(event, field, value)
+                fields.add(field)
+            updated[pk] = event
+            errors.append({})
+
+        if any(errors):
+            return Response({'errors': self._row_errors(errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_update bypasses auto_now, move `updated` explicitly so ETags change
+        for event in updated.values():
+            event.updated = context['now']
+        with transaction.atomic():
+            Event.objects.bulk_update(updated.values(), [*fields, 'updated'], batch_size=self.bulk_batch_size)
+            if 'capacity' in fields:
+                for pk in updated:
+                    registration.promote_waitlist(pk)
+        cache.invalidate_events(updated)
+        notifications.notify(notifications.UPDATED, updated)
+
+        return Response({'updated': list(updated)})
 
     # checks if the user updating the event is its creator
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
 
-        if instance.created_by != request.user:
+        if instance.created_by_id != request.user.id:
             message = 'To update an event, you must be the creator of that event.'
             raise PermissionDenied(message)
 
         return super().update(request, *args, **kwargs)
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
+    # seats added by a raised capacity go to the waitlist right away; `attendees` is read-only, so capacity is the
+    # only field of an update that can free a seat
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+            if 'capacity' in serializer.validated_data and registration.promote_waitlist(serializer.instance.pk):
+                serializer.instance.refresh_from_db(fields=['attendee_count', 'updated'])
+
+    # ?compact=true switches reads to the compact representation
+    def get_serializer_class(self):
+        if self.action in (*self.list_actions, 'retrieve') and self._compact():
+            return EventCompactSerializer
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in (*self.list_actions, 'retrieve'):
+            kwargs.setdefault('fields', self.representation_fields())
+        if self._fast_read():
+            kwargs.setdefault('context', self.get_serializer_context())
+            return EventValuesSerializer(*args, **kwargs)
+        return super().get_serializer(*args, **kwargs)
+
+    # the list is read as `.values()` rows and serialized by EventValuesSerializer, see EVENTS_FAST_READ_SERIALIZER
+    def _fast_read(self):
+        return self.action in self.list_actions and getattr(settings, 'EVENTS_FAST_READ_SERIALIZER', True)
 
-        # Filter events by date
-        date = self.request.query_params.get('date')
-        if date:
-            queryset = queryset.filter(start_date__date=date)
+    # the validators aggregate runs on the model queryset, only the page itself is read as `.values()` rows
+    def paginate_queryset(self, queryset):
+        if self._fast_read():
+            queryset = queryset.values(*EventValuesSerializer.columns(self.representation_fields()))
+        return super().paginate_queryset(queryset)
 
-        # Filter past events
-        past = self.request.query_params.get('past')
-        if past:
-            queryset = queryset.filter(start_date__lt=timezone.now())
+    def _compact(self):
+        value = self.request.query_params.get('compact')
+        if not value:
+            return False
 
-        # Filter future events
-        future = self.request.query_params.get('future')
-        if future:
-            queryset = queryset.filter(start_date__gt=timezone.now())
+        compact = parse_bool(value)
+        if compact is None:
+            raise ValidationError({'compact': ['Enter true or false.']})
+        return compact
+
+    # fields of the read representation after applying ?fields= and ?omit=
+    def representation_fields(self):
+        available = self.get_serializer_class().Meta.fields
+        params = self.request.query_params
+        fields = available
+        # the detail only inlines the attendee ids when asked to with ?fields=, they are paged by /attendees/
+        if self.action == 'retrieve' and not params.get('fields', '').strip():
+            fields = [name for name in fields if name != 'attendees']
+
+        for param in ('fields', 'omit'):
+            names = [name.strip() for name in params.get(param, '').split(',') if name.strip()]
+            unknown = sorted(set(names) - set(available))
+            if unknown:
+                raise ValidationError({param: [f'Unknown field(s): {", ".join(unknown)}.']})
+            if names and param == 'fields':
+                fields = [name for name in fields if name in names]
+            elif names:
+                fields = [name for name in fields if name not in names]
+
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        # model read path: only the columns of the requested fields, one JOIN for the creator and one batched query
+        # for the attendee ids, so the number of queries stays constant whatever the page size
+        if self.action in (*self.list_actions, 'retrieve') and not self._fast_read():
+            fields = self.representation_fields()
+            # the pagination keys are always loaded
+            columns = {'start_date', 'end_date'}
+            for name in fields:
+                columns.update(EVENT_FIELD_COLUMNS[name])
+            if 'created_by' in fields:
+                queryset = queryset.select_related('created_by')
+            if 'attendees' in fields:
+                attendees = User.objects.only('id').order_by('id')
+                queryset = queryset.prefetch_related(Prefetch('attendees', queryset=attendees))
+            queryset = queryset.only(*columns)
 
         return queryset
 
@@ -55,17 +297,10 @@ class EventViewSet(ModelViewSet):
     def register(self, request, pk=None):
         event = self.get_object()
 
-        if event.attendees.count() == event.capacity:
-            message = 'The attendance list for this event is full. You cannot register at this time.'
-        elif event.start_date < datetime.now().replace(tzinfo=pytz.utc):
-            message = 'The event has already started, you cannot register to it.'
-        else:
-            event.attendees.add(request.user)
-            event.save()
-            message = f'Registered user: {request.user.id} for event: {event.pk}'
+        result = registration.register_attendee(event.pk, request.user.id)
 
         response_data = {
-            'message': message,
+            'message': register_message(result, request.user.id, event.pk),
             'event_id': event.pk,
             'user_id': request.user.id,
             }
@@ -77,8 +312,7 @@ class EventViewSet(ModelViewSet):
     def unregister(self, request, pk=None):
         event = self.get_object()
 
-        event.attendees.remove(request.user)
-        event.save()
+        registration.unregister_attendee(event.pk, request.user.id)
 
         response_data = {
             'message': f'Unregistered user: {request.user.id} for event: {event.pk}',
@@ -87,3 +321,141 @@ class EventViewSet(ModelViewSet):
             }
 
         return Response(response_data)
+
+    # POST registers the user, or queues them when the event is full, DELETE takes them off the queue; all three
+    # methods return their place in it. Unregistering hands the freed seat to the head of the queue.
+    @action(detail=True, methods=['get', 'post', 'delete'])
+    def waitlist(self, request, pk=None):
+        event = self.get_object()
+        user_id = request.user.id
+
+        response_data = {'event_id': event.pk, 'user_id': user_id}
+        if request.method == 'POST':
+            result = registration.join_waitlist(event.pk, user_id)
+            response_data['message'] = waitlist_message(result, user_id, event.pk)
+        elif request.method == 'DELETE':
+            result = registration.leave_waitlist(event.pk, user_id)
+            response_data['message'] = waitlist_message(result, user_id, event.pk)
+        response_data['position'] = registration.waitlist_position(event.pk, user_id)
+
+        return Response(response_data)
+
+    # attendees of an event, keyset-paginated over the attendance table; `username` filters by prefix
+    @action(detail=True, methods=['get'])
+    def attendees(self, request, pk=None):
+        event = self.get_object()
+
+        attendees = registration.Attendance.objects.filter(event_id=event.pk).values('user_id', 'user__username')
+        username = request.query_params.get('username', '').strip()
+        if username:
+            attendees = attendees.filter(user__username__istartswith=username)
+
+        paginator = AttendeeCursorPagination()
+        page = paginator.paginate_queryset(attendees, request, view=self)
+        return paginator.get_paginated_response(AttendeeSerializer(page, many=True).data)
+
+    # only the creator of the event (or staff) can register or unregister other users
+    def _check_can_manage_attendees(self, event):
+        if event.created_by_id != self.request.user.id and not self.request.user.is_staff:
+            message = 'To manage the attendees of an event, you must be the creator of that event.'
+            raise PermissionDenied(message)
+
+    def _bulk_response(self, results, key, **extra):
+        return Response({
+            **extra,
+            'results': [{key: item_id, 'result': result} for item_id, result in results.items()],
+            })
+
+    # bulk registration of many users for one event
+    @action(detail=True, methods=['post'], url_path='register-users')
+    def register_users(self, request, pk=None):
+        event = self.get_object()
+        self._check_can_manage_attendees(event)
+        serializer = UserIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = registration.register_attendees(event.pk, serializer.validated_data['user_ids'])
+
+        return self._bulk_response(results, 'user_id', event_id=event.pk)
+
+    # bulk de-registration of many users from one event
+    @action(detail=True, methods=['post'], url_path='unregister-users')
+    def unregister_users(self, request, pk=None):
+        event = self.get_object()
+        self._check_can_manage_attendees(event)
+        serializer = UserIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = registration.unregister_attendees(event.pk, serializer.validated_data['user_ids'])
+
+        return self._bulk_response(results, 'user_id', event_id=event.pk)
+
+    # registration of the current user for many events
+    @action(detail=False, methods=['post'], url_path='register-many')
+    def register_many(self, request):
+        serializer = EventIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = registration.register_events(request.user.id, serializer.validated_data['event_ids'])
+
+        return self._bulk_response(results, 'event_id', user_id=request.user.id)
+
+    # de-registration of the current user from many events
+    @action(detail=False, methods=['post'], url_path='unregister-many')
+    def unregister_many(self, request):
+        serializer = EventIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = registration.unregister_events(request.user.id, serializer.validated_data['event_ids'])
+
+        return self._bulk_response(results, 'event_id', user_id=request.user.id)
+
+    def _export_format(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in export.FORMATS:
+            raise ValidationError({'output': [f'Choose one of: {", ".join(export.FORMATS)}.']})
+        return output
+
+    # events created by the user, a range scan of event_creator_start_idx in the default ordering
+    @action(detail=False, methods=['get'], url_path='mine/created')
+    def mine_created(self, request):
+        return self._events_page(self.get_queryset().filter(created_by_id=request.user.id))
+
+    # events the user is registered for, reached through the attendance table's user index
+    @action(detail=False, methods=['get'], url_path='mine/attending')
+    def mine_attending(self, request):
+        return self._events_page(self.get_queryset().filter(attendees=request.user.id))
+
+    # the user's event counts, cached until the next change to any event
+    @action(detail=False, methods=['get'], url_path='mine/summary')
+    def mine_summary(self, request):
+        user_id = request.user.id
+        return Response(cache.cached_summary(user_id, lambda: {
+            'created': Event.objects.filter(created_by_id=user_id).count(),
+            'attending': registration.Attendance.objects.filter(user_id=user_id).count(),
+            }))
+
+    def _events_page(self, queryset):
+        page = self.paginate_queryset(self.filter_queryset(queryset))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    # streamed export of the (filtered) events list, as NDJSON or CSV
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        output = self._export_format(request)
+        return export.export_events(self.filter_queryset(self.get_queryset()), output)
+
+    # streamed export of the attendee list of an event, for its creator
+    @action(detail=True, methods=['get'], url_path='export-attendees')
+    def export_attendees(self, request, pk=None):
+        output = self._export_format(request)
+        event = self.get_object()
+        self._check_can_manage_attendees(event)
+
+        attendees = registration.Attendance.objects.filter(event_id=event.pk).order_by('user_id')
+        return export.export_attendees(attendees, output, event.pk)
+
+    # response cache hit/miss counters of this process
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        return Response(cache.cache_stats())
@@ -0,0 +1,29 @@
+import codecs
+import io
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# JSONParser with orjson doing the decoding. orjson rejects NaN/Infinity and integers over 64 bits, so a body it
+# refuses is handed to JSONParser, which accepts what DRF accepts and raises DRF's usual ParseError otherwise.
+# Without orjson installed this is JSONParser.
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        if codecs.lookup(encoding).name != 'utf-8':
+            body = body.decode(encoding).encode()
+
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, {**parser_context, 'encoding': 'utf-8'})
@@ -0,0 +1,31 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# DRF's JSONRenderer output, written by orjson: compact separators, UTF-8, datetimes as ISO 8601 with 'Z' for UTC.
+# Types orjson does not know (Decimal, timedelta, lazy strings, querysets...) go through DRF's encoder, and
+# anything orjson refuses (integers over 64 bits, keys of other types) is rendered by JSONRenderer itself, as is
+# indented output for the browsable API. Without orjson installed this is JSONRenderer. Floats are the exception:
+# NaN and infinities come out as null instead of raising, and exponents are spelled 1e16 rather than 1e+16.
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # same escaping as JSONRenderer, so the output stays a strict javascript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -103,6 +104,64 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+
+# The first hasher of a profile hashes new passwords, the others still verify existing hashes. `fast` (salted
+# MD5) is for the test suite and local development only; the environment variable PASSWORD_HASHER_PROFILE
+# picks the profile, manager.test_runner.TestRunner runs the tests with `fast` unless it is set.
+PASSWORD_HASHER_PROFILES = {
+    'default': [
+        'auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+        ],
+    'fast': [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'auth.hashers.PBKDF2PasswordHasher',
+        ],
+    }
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'default')
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+# PBKDF2 iterations of auth.hashers.PBKDF2PasswordHasher, None for Django's default
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 0)) or None
+# threads computing password hashes (None: half the cores, 0: on the request thread) and hashes allowed to wait
+# for one, see auth.hashing
+PASSWORD_HASHING_WORKERS = None
+PASSWORD_HASHING_BACKLOG = 64
+
+TEST_RUNNER = 'manager.test_runner.TestRunner'
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# local-memory caches are per process and evict the least recently used entries once MAX_ENTRIES is reached
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    'events': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'events',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            },
+        },
+    }
+
+# cache EventViewSet list/retrieve responses in the 'events' cache, invalidated on every event write
+EVENTS_RESPONSE_CACHE = True
+EVENTS_CACHE_ALIAS = 'events'
+# fan-out of the change notifications streamed by /async/events/stream/, a events.notifications.NotificationBackend;
+# the local backend only reaches the streams of its own process
+EVENTS_NOTIFICATION_BACKEND = 'events.notifications.LocalNotificationBackend'
+# serialize the events list from .values() rows with events.serializers.EventValuesSerializer
+EVENTS_FAST_READ_SERIALIZER = True
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -128,11 +187,28 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth.authentication.ConfigurableJWTAuthentication',
+        ],
+    # orjson based JSON, same output as DRF's JSONRenderer/JSONParser (which they fall back to without orjson)
+    'DEFAULT_RENDERER_CLASSES': [
+        'manager.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        ],
+    'DEFAULT_PARSER_CLASSES': [
+        'manager.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
         ],
     }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'ROTATE_REFRESH_TOKENS': True,
-    }
\ No newline at end of file
+    'TOKEN_USER_CLASS': 'auth.authentication.CachedTokenUser',
+    }
+
+# build request.user from the access token claims instead of loading the User row on every request,
+# see auth.authentication.ConfigurableJWTAuthentication for the revocation trade-off
+JWT_STATELESS_AUTH = False
+# seconds a User row fetched for a stateless token user is reused
+JWT_USER_CACHE_TTL = 60
\ No newline at end of file
@@ -0,0 +1,20 @@
+import os
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+# Runs the suite with the `fast` password hasher profile, unless PASSWORD_HASHER_PROFILE names another one.
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        profile = os.environ.get('PASSWORD_HASHER_PROFILE', 'fast')
+        self._hashers = override_settings(
+            PASSWORD_HASHER_PROFILE=profile,
+            PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES[profile],
+            )
+        self._hashers.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._hashers.disable()
+        super().teardown_test_environment(**kwargs)
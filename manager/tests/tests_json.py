@@ -0,0 +1,129 @@
+from datetime import (
+    date,
+    datetime,
+    time,
+    timedelta,
+    timezone as dt_timezone,
+    )
+from decimal import Decimal
+import io
+import json
+from unittest import mock
+import uuid
+from zoneinfo import ZoneInfo
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import (
+    ErrorDetail,
+    ParseError,
+    )
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from events.cache import get_cache
+from events.models import Event
+from manager.parsers import FastJSONParser
+from manager.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTest(TestCase):
+    def assertSameOutput(self, data, accepted_media_type=None, renderer_context=None):
+        expected = JSONRenderer().render(data, accepted_media_type, renderer_context)
+        self.assertEqual(FastJSONRenderer().render(data, accepted_media_type, renderer_context), expected)
+
+    def test_values(self):
+        self.assertSameOutput({
+            'datetimes': [datetime(2023, 5, 1, 10, 30, 0, 123456, tzinfo=dt_timezone.utc),
+                          datetime(2023, 5, 1, 10, 30, tzinfo=ZoneInfo('Europe/Warsaw')),
+                          datetime(2023, 12, 1, 10, 30, tzinfo=ZoneInfo('Europe/London')),
+                          datetime(2023, 5, 1, 10, 30, 0, 5)],
+            'date': date(2023, 5, 1),
+            'time': time(10, 30, 0, 250),
+            'timedelta': timedelta(hours=1, microseconds=5),
+            'decimals': [Decimal('10.50'), Decimal('0.1'), Decimal('-3')],
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Not found.'),
+            'error': ErrorDetail('This field is required.', code='required'),
+            'text': 'zażółć "gęślą" jaźń \\    \n\t 😀',
+            'numbers': [0, -1, 2 ** 63 - 1, 1.5, 0.1, 12345.678],
+            'nested': ((1, 2), [], {}, None, True, False),
+            1: 'int key',
+            })
+
+    def test_fallbacks(self):
+        # orjson refuses these, JSONRenderer renders them
+        self.assertSameOutput({'big': 2 ** 70})
+        self.assertSameOutput([-2 ** 64])
+        self.assertSameOutput(None)
+        self.assertSameOutput({'a': [1, 2]}, accepted_media_type='application/json; indent=4')
+        self.assertSameOutput({'a': [1, 2]}, renderer_context={'indent': 2})
+
+    def test_float_exponents(self):
+        # spelled 1e-7/1e16 instead of 1e-07/1e+16, the same numbers
+        data = [1e-07, 1e+16]
+
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_without_orjson(self):
+        with mock.patch('manager.renderers.orjson', None):
+            self.assertSameOutput({'a': datetime(2023, 5, 1, tzinfo=dt_timezone.utc)})
+
+    def test_api_responses(self):
+        get_cache().clear()
+        user = User.objects.create(username='testuser')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        start = timezone.now() + timedelta(days=1)
+        for i in range(3):
+            event = Event.objects.create(name=f'Événement {i}', description='Line break', start_date=start,
+                                         end_date=start + timedelta(hours=i), capacity=5, created_by=user)
+            event.attendees.add(user)
+
+        for url in ('/events/', f'/events/{event.pk}/', '/events/?compact=true', f'/events/{event.pk}/attendees/',
+                    '/events/?date=invalid', '/events/0/'):
+            get_cache().clear()
+            response = client.get(url)
+            self.assertEqual(response.content, JSONRenderer().render(response.data), url)
+
+
+class FastJSONParserTest(TestCase):
+    def parse(self, body, parser_class=FastJSONParser, encoding='utf-8'):
+        return parser_class().parse(io.BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parse(self):
+        body = '{"name": "Zażółć", "ids": [1, 2, 3], "capacity": 1.5, "none": null}'.encode()
+
+        self.assertEqual(self.parse(body), self.parse(body, JSONParser))
+
+    def test_other_encoding(self):
+        body = '{"name": "Zażółć"}'.encode('utf-16')
+
+        self.assertEqual(self.parse(body, encoding='utf-16'), {'name': 'Zażółć'})
+
+    def test_falls_back_to_json_parser(self):
+        self.assertEqual(self.parse(b'{"big": 100000000000000000000}'), {'big': 10 ** 20})
+
+        with self.assertRaises(ParseError):
+            self.parse(b'{"capacity": NaN}')
+        with self.assertRaises(ParseError):
+            self.parse(b'{"name": ')
+
+    def test_without_orjson(self):
+        with mock.patch('manager.parsers.orjson', None):
+            self.assertEqual(self.parse(b'{"a": [1]}'), {'a': [1]})
+
+    def test_api_request(self):
+        user = User.objects.create(username='testuser')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        start = timezone.now() + timedelta(days=1)
+
+        response = client.post('/events/', {'name': 'New Event', 'start_date': start.isoformat(),
+                                            'end_date': (start + timedelta(hours=1)).isoformat(), 'capacity': 5},
+                               format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Event.objects.get().name, 'New Event')